@@ -1,41 +1,58 @@
 # File: pr_analysis.py
 
-import csv
 from datetime import datetime, timezone
-from github import Github
 import json
 import re
 import requests
 import pytz
 from bs4 import BeautifulSoup
-from pr_analysis_config import PRAnalysisConfig
+from pr_client_factory import get_client_factory
+from pr_review_rounds import PRReviewRounds
+from pr_analysis_sink import get_sink
 import traceback
 
+def parse_timestamp(timestamp):
+    # Inverse of str(datetime) / GitHub ISO 8601 strings; 'N.A.' is kept as the missing-value sentinel.
+    # Offsets such as push timestamps in the committer's local time are normalised to UTC.
+    if not timestamp or timestamp == 'N.A.' or timestamp == 'None':
+        return 'N.A.'
+    parsed = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc)
+    return parsed
+
 class PRAnalysis:
     def __init__(self, properties_file='pr_analysis.properties'):
-        self.pr_analysis_config = PRAnalysisConfig(properties_file)
-        self.properties = self.pr_analysis_config.read_properties()
+        # The factory is cached per properties file and process, so repeated PRAnalysis
+        # instances share the parsed config, compiled URL patterns and github client.
+        self.client_factory = get_client_factory(properties_file)
+        self.pr_analysis_config = self.client_factory.pr_analysis_config
+        self.properties = self.client_factory.properties
 
         #TODO: Validate git access token using API.
-        #TODO: Validate the PR URL against the GIT domain.
-        
-        if self.properties:
-            self.git_provider = self.properties.get('git.provider', '')
-            self.git_access_token = self.properties.get('git.access_token', '')
-            self.git_domain = self.properties.get('git.domain', '')
-            if (self.git_provider.endswith("ENTERPRISE")):
-                self.base_url = self.git_domain + "/api/v3"
-                self.github = Github(base_url=self.base_url, login_or_token=self.git_access_token)
-            else:
-                self.base_url = self.git_domain
-                self.github = Github(self.git_access_token)
-            print("Created the github instance.")
+
+        if self.client_factory.is_valid_config:
+            self.git_provider = self.client_factory.git_provider
+            self.git_access_token = self.client_factory.git_access_token
+            self.git_domain = self.client_factory.git_domain
+            self.base_url = self.client_factory.base_url
+            self.github = self.client_factory.get_github()
             self.default_reviewer = self.properties.get('default.reviewer', '')
             self.is_ai_reviewer = False
             self.ai_reviewer = self.properties.get('ai.reviewer', '')
             self.ai_reviewer_regex = self.properties.get('ai.reviewer.regex', '')
             if self.ai_reviewer and self.ai_reviewer_regex:
                 self.is_ai_reviewer = True
+                self.ai_reviewer_pattern = re.compile(self.ai_reviewer_regex, re.DOTALL)
+            # Logins of the AI reviewer's bot accounts; review submissions are classified by login
+            # since their bodies rarely match the comment regex.
+            self.ai_reviewer_logins = [login.strip() for login in self.properties.get('ai.reviewer.logins', '').split(',') if login.strip()]
+            # Streaming folds review comments into per-window aggregates instead of keeping them all,
+            # unless keep_bodies asks for every comment to be retained as in the non-streaming mode.
+            self.stream_review_comments = self.properties.get('review.comments.streaming', 'false').lower() == 'true'
+            self.keep_comment_bodies = self.properties.get('review.comments.keep_bodies', 'false').lower() == 'true'
+            # Commit and PR patches are read from the local store when one is configured.
+            self.patch_store_dir = self.properties.get('patch.store_dir', '')
             self.is_valid_config = True
         else:
             print("Failed to initialize PRAnalysis due to missing or invalid properties.")
@@ -51,29 +68,21 @@ class PRAnalysis:
         print(f"Is AI Reviewer Available?: {self.is_ai_reviewer}")
         print(f"AI Reviewer: {self.ai_reviewer}")
         print(f"AI Reviewer RegEx: {self.ai_reviewer_regex}")
+        print(f"AI Reviewer Logins: {self.ai_reviewer_logins}")
+        print(f"Stream Review Comments: {self.stream_review_comments}")
+        print(f"Keep Comment Bodies: {self.keep_comment_bodies}")
+        print(f"Patch Store Directory: {self.patch_store_dir}")
         print("=" * 50)
 
     def parse_pr_url(self):
-        # Escape special characters in domain to handle domains that might contain them
-        self.escaped_domain = re.escape(self.git_domain)
-        pattern = fr"{self.escaped_domain}/([^/]+)/([^/]+)/pull/(\d+)"
-        match = re.match(pattern, self.url)
-        if match:
-            print("PR URL is valid.")
-            return match.groups()
-        else:
-            raise ValueError("Invalid PR URL format")
+        pr_url_parts = self.client_factory.parse_pr_url(self.url)
+        print("PR URL is valid.")
+        return pr_url_parts
 
     def parse_repo_url(self, repo_url):
-        # Escape special characters in domain to handle domains that might contain them
-        self.escaped_domain = re.escape(self.git_domain)
-        pattern = fr"{self.escaped_domain}/([^/]+)/([^/]+)"
-        match = re.match(pattern, repo_url)
-        if match:
-            print("Repo URL is valid.")
-            return match.groups()
-        else:
-            raise ValueError("Invalid Repo URL format")
+        repo_url_parts = self.client_factory.parse_repo_url(repo_url)
+        print("Repo URL is valid.")
+        return repo_url_parts
 
     def convert_html_to_plaintext(self):
         # Parse the HTML content
@@ -139,6 +148,13 @@ class PRAnalysis:
             else:
                 self.pr_creation_commits.append(commit)
 
+        self.pr_creation_commit_times = [commit.commit.committer.date for commit in self.pr_creation_commits]
+        self.incremental_commit_times = [commit.commit.committer.date for commit in self.incremental_commits]
+
+    def get_patch_store(self):
+        # Opened on the first patch lookup, so runs that never read a diff leave no store behind.
+        return self.client_factory.get_patch_store()
+
     def print_pr_commits(self, commits):
         for commit in commits:
             print(f"Commit SHA: {commit.sha}")
@@ -146,15 +162,22 @@ class PRAnalysis:
             print(f"HTML URL: {commit.html_url}")
             print(f"Commit message: {commit.commit.message}")
             print(f"Commit time: {commit.commit.committer.date}")
+            patch_store = self.get_patch_store()
+            if patch_store:
+                stats = patch_store.get_commit_stats(commit)
+                files = patch_store.get_commit_files(commit)
+            else:
+                stats = commit.stats
+                files = commit.files
             # Print detailed stats
             print("\nStats:")
-            if commit.stats:
-                print(f"Additions: {commit.stats.additions}")
-                print(f"Deletions: {commit.stats.deletions}")
-                print(f"Total changes: {commit.stats.total}")
+            if stats:
+                print(f"Additions: {stats.additions}")
+                print(f"Deletions: {stats.deletions}")
+                print(f"Total changes: {stats.total}")
             # Print files changed
             print("\nFiles changed:")
-            for file in commit.files:
+            for file in files:
                 print(f"- {file.filename} ({file.status})")
                 print(f"  Changes: +{file.additions} -{file.deletions}")
             print("---")
@@ -176,7 +199,12 @@ class PRAnalysis:
 
     def get_diff_hunk_for_comment(self, comment):
         lines = []
-        for file in self.pr.get_files():
+        patch_store = self.get_patch_store()
+        if patch_store:
+            files = patch_store.get_pr_files(self.pr)
+        else:
+            files = self.pr.get_files()
+        for file in files:
             if file.filename == comment.path:
                 patch = file.patch
                 if patch:
@@ -200,12 +228,139 @@ class PRAnalysis:
     
         return '\n'.join(lines)
 
+    def classify_comment(self, body):
+        if self.is_ai_reviewer and body and self.ai_reviewer_pattern.search(body):
+            return self.ai_reviewer
+        return self.default_reviewer
+
+    def init_review_windows(self):
+        # Each window keeps only its first and last matching comment, so memory does not grow with the PR.
+        self.review_windows = {}
+        for window_name in ['all', 'full', 'first_incremental', 'last_incremental']:
+            self.review_windows[window_name] = [None, None]
+        self.reviewer_num_comments = {}
+        self.review_id_reviewers = {}
+        self.ai_reviewer_comment_logins = set(self.ai_reviewer_logins)
+
+        self.review_rounds = PRReviewRounds(self.creation_time, len(self.pr_creation_commit_times), self.incremental_commit_times)
+
+    def fold_review_comment(self, comment_data):
+        created_at = comment_data['created_at']
+        matching_windows = ['all']
+
+        if len(self.pr_creation_commit_times) > 0:
+            if len(self.incremental_commit_times) > 0:
+                if created_at <= self.incremental_commit_times[0]:
+                    matching_windows.append('full')
+            elif created_at >= self.pr_creation_commit_times[0]:
+                matching_windows.append('full')
+        if len(self.incremental_commit_times) > 0:
+            if created_at >= self.incremental_commit_times[0]:
+                matching_windows.append('first_incremental')
+            if created_at >= self.incremental_commit_times[-1]:
+                matching_windows.append('last_incremental')
+
+        for window_name in matching_windows:
+            window = self.review_windows[window_name]
+            if window[0] is None:
+                window[0] = comment_data
+            window[1] = comment_data
+
+        reviewer = comment_data['reviewer']
+        self.reviewer_num_comments[reviewer] = self.reviewer_num_comments.get(reviewer, 0) + 1
+        review_id = comment_data.get('review_id')
+        if self.is_ai_reviewer and reviewer == self.ai_reviewer:
+            self.ai_reviewer_comment_logins.add(comment_data['user'])
+            if review_id is not None:
+                self.review_id_reviewers[review_id] = reviewer
+        elif review_id is not None and review_id not in self.review_id_reviewers:
+            self.review_id_reviewers[review_id] = reviewer
+        self.review_rounds.add_review_event(created_at, reviewer, 'comment', review_id)
+
+    def classify_review_submission(self, review_data):
+        # A review takes the type of the comments it carries, then of its author's login;
+        # the body regex is only the last resort.
+        if review_data['id'] in self.review_id_reviewers:
+            return self.review_id_reviewers[review_data['id']]
+        if self.is_ai_reviewer and review_data['user'] in self.ai_reviewer_comment_logins:
+            return self.ai_reviewer
+        return review_data['reviewer']
+
+    def fold_review_submissions(self):
+        # Folded after the comments so their classification is known, and so a submission
+        # sharing a timestamp with its own comments never displaces them as the first event.
+        for review_data in self.review_submissions:
+            reviewer = self.classify_review_submission(review_data)
+            self.review_rounds.add_review_event(review_data['submitted_at'], reviewer, 'review', review_data['id'])
+
+    def get_review_windows(self):
+        if self.review_windows is None:
+            self.init_review_windows()
+            for comment_data in self.comments_data:
+                self.fold_review_comment(comment_data)
+            self.fold_review_submissions()
+        return self.review_windows
+
+    def get_review_submissions(self):
+        # Review submissions (approve / request changes / comment) are few per PR, so they are kept as a list.
+        self.review_submissions = []
+        for review in self.pr.get_reviews():
+            if not review.submitted_at:
+                continue
+            self.review_submissions.append({
+                "id": review.id,
+                "user": review.user.login if review.user else '',
+                "state": review.state,
+                "submitted_at": review.submitted_at,
+                "reviewer": self.classify_comment(review.body)
+            })
+
+    def stream_pr_review_comments(self):
+        # Fetch page by page: iterating the PaginatedList directly would cache every comment object.
+        page = 0
+        while True:
+            comments = self.review_comments.get_page(page)
+            if not comments:
+                break
+            for comment in comments:
+                comment_data = {
+                    "id": comment.id,
+                    "user": comment.user.login,
+                    "created_at": comment.created_at,
+                    "review_id": comment.pull_request_review_id,
+                    "reviewer": self.classify_comment(comment.body)
+                }
+                if comment_data['reviewer'] == self.ai_reviewer:
+                    self.ai_reviewer_num_comments = self.ai_reviewer_num_comments + 1
+                self.num_comments = self.num_comments + 1
+                self.fold_review_comment(comment_data)
+                if self.keep_comment_bodies:
+                    # Retained in full so print_review_comments and export_pr_state still see every comment.
+                    comment_data.update({
+                        "body": comment.body,
+                        "updated_at": comment.updated_at,
+                        "path": comment.path,
+                        "position": comment.position,
+                        "commit_id": comment.commit_id,
+                        "original_position": comment.original_position,
+                        "diff_hunk": comment.diff_hunk
+                    })
+                    self.comments_data.append(comment_data)
+            page = page + 1
+
     def get_review_comments(self):
         self.review_comments = self.pr.get_review_comments()
         #self.review_comments = self.pr.get_comments()
         self.comments_data = []
         self.num_comments = 0
         self.ai_reviewer_num_comments = 0
+        self.review_windows = None
+
+        if self.stream_review_comments:
+            self.init_review_windows()
+            self.stream_pr_review_comments()
+            self.fold_review_submissions()
+            return
 
         for comment in self.review_comments:
             comment_data = {
@@ -218,7 +373,8 @@ class PRAnalysis:
                 "position": comment.position,
                 "commit_id": comment.commit_id,
                 "original_position": comment.original_position,
-                "diff_hunk": comment.diff_hunk
+                "diff_hunk": comment.diff_hunk,
+                "review_id": comment.pull_request_review_id
             }
 
             #diff_hunk = self.get_diff_hunk_for_comment(comment)
@@ -236,11 +392,9 @@ class PRAnalysis:
             #ai_reviewer_str_2 = "<div id=\"issue\">"
             #ai_reviewer_str_3 = "<b>Code suggestion</b>"
             #if self.is_ai_reviewer and (ai_reviewer_str_1 in comment_data['body']) and (ai_reviewer_str_2 in comment_data['body']) and (ai_reviewer_str_3 in comment_data['body']):
-            if self.is_ai_reviewer and re.search(self.ai_reviewer_regex, comment_data['body'], re.DOTALL):
-                comment_data['reviewer'] = self.ai_reviewer
+            comment_data['reviewer'] = self.classify_comment(comment_data['body'])
+            if comment_data['reviewer'] == self.ai_reviewer:
                 self.ai_reviewer_num_comments = self.ai_reviewer_num_comments + 1
-            else:
-                comment_data['reviewer'] = self.default_reviewer
             self.num_comments = self.num_comments + 1
 
             self.comments_data.append(comment_data)
@@ -269,30 +423,6 @@ class PRAnalysis:
             print("-" * 50)
         print("=" * 50)
 
-    def extract_first_last_reviews_after_timestamp(self, timestamp):
-        first_review = None
-        last_review = None
-
-        for comment in self.comments_data:
-            if comment['created_at'] >= timestamp:
-                if not first_review:
-                    first_review = comment
-                last_review = comment
-
-        return first_review, last_review
-        
-    def extract_first_last_reviews_before_timestamp(self, timestamp):
-        first_review = None
-        last_review = None
-
-        for comment in self.comments_data:
-            if comment['created_at'] <= timestamp:
-                if not first_review:
-                    first_review = comment
-                last_review = comment
-
-        return first_review, last_review
-        
     def build_pr_analysis_dict(self):
         pr_analysis_dict = {}
 
@@ -303,15 +433,20 @@ class PRAnalysis:
         pr_analysis_dict['repo_owner'] = self.repo_owner
         pr_analysis_dict['creation_timestamp'] = str(self.creation_time)
         pr_analysis_dict['description'] = self.description
-        pr_analysis_dict['num_commits_before_pr_creation'] = len(self.pr_creation_commits)
-        pr_analysis_dict['num_commits_incremental'] = len(self.incremental_commits)
+        pr_analysis_dict['num_commits_before_pr_creation'] = len(self.pr_creation_commit_times)
+        pr_analysis_dict['num_commits_incremental'] = len(self.incremental_commit_times)
         pr_analysis_dict['num_comments_made_by_human'] = self.num_comments - self.ai_reviewer_num_comments
         pr_analysis_dict['num_comments_made_by_ai'] = self.ai_reviewer_num_comments
         pr_analysis_dict['merge_timestamp'] = str(self.merge_time)
         pr_analysis_dict['close_timestamp'] = str(self.close_time)
 
         #build the 1st & last review suggestion data
-        first_review, last_review = self.extract_first_last_reviews_after_timestamp(datetime.fromtimestamp(0, tz=timezone.utc))
+        review_windows = self.get_review_windows()
+        review_rounds = self.review_rounds.get_rounds()
+        pr_analysis_dict['num_review_rounds'] = self.review_rounds.get_num_reviewed_rounds()
+        pr_analysis_dict['review_rounds'] = json.dumps(review_rounds)
+        pr_analysis_dict['num_comments_by_reviewer'] = json.dumps(self.reviewer_num_comments)
+        first_review, last_review = review_windows['all']
         if first_review:
            pr_analysis_dict['first_suggestion_review_type'] = first_review['reviewer']
            pr_analysis_dict['first_suggestion_review_timestamp'] = str(first_review['created_at'])
@@ -328,18 +463,15 @@ class PRAnalysis:
 
         #build the 1st & last commit and review data for PR creation and before 1st incremental commit ==> for full review
         #TODO: this we will have to correlate with Bito analytics data if available.
-        num_pr_creation_commits = len(self.pr_creation_commits)
-        num_incremental_commits = len(self.incremental_commits)
+        num_pr_creation_commits = len(self.pr_creation_commit_times)
+        num_incremental_commits = len(self.incremental_commit_times)
         if num_pr_creation_commits > 0:
             first_review = None
             last_review = None
 
             #if incremental commit is available then look for the full reviews before incremental review time-stamp
             #else look with-in full reviews available i.e. case of no incremental commits are there. 
-            if num_incremental_commits > 0:
-                first_review, last_review = self.extract_first_last_reviews_before_timestamp(self.incremental_commits[0].commit.committer.date)
-            else:
-                first_review, last_review = self.extract_first_last_reviews_after_timestamp(self.pr_creation_commits[0].commit.committer.date)
+            first_review, last_review = review_windows['full']
 
             if first_review:
                 pr_analysis_dict['first_full_review_type'] = first_review['reviewer']
@@ -363,13 +495,13 @@ class PRAnalysis:
                 
         #build the 1st & last incremental commit and review data.
         #TODO: this we will have to correlate with Bito analytics data if available.
-        num_incremental_commits = len(self.incremental_commits)
+        num_incremental_commits = len(self.incremental_commit_times)
         if num_incremental_commits > 0:
             first_review = None
             last_review = None
 
-            pr_analysis_dict['first_incremental_commit_timestamp'] = str(self.incremental_commits[0].commit.committer.date)
-            first_review, last_review = self.extract_first_last_reviews_after_timestamp(self.incremental_commits[0].commit.committer.date)
+            pr_analysis_dict['first_incremental_commit_timestamp'] = str(self.incremental_commit_times[0])
+            first_review, last_review = review_windows['first_incremental']
             if first_review:
                 pr_analysis_dict['first_incremental_review_type'] = first_review['reviewer']
                 pr_analysis_dict['first_incremental_review_timestamp'] = str(first_review['created_at'])
@@ -377,8 +509,8 @@ class PRAnalysis:
                 pr_analysis_dict['first_incremental_review_type'] = 'N.A.'
                 pr_analysis_dict['first_incremental_review_timestamp'] = 'N.A.'
 
-            pr_analysis_dict['last_incremental_commit_timestamp'] = str(self.incremental_commits[num_incremental_commits - 1].commit.committer.date)
-            first_review, last_review = self.extract_first_last_reviews_after_timestamp(self.incremental_commits[num_incremental_commits - 1].commit.committer.date)
+            pr_analysis_dict['last_incremental_commit_timestamp'] = str(self.incremental_commit_times[num_incremental_commits - 1])
+            first_review, last_review = review_windows['last_incremental']
             if last_review:
                 pr_analysis_dict['last_incremental_review_type'] = last_review['reviewer']
                 pr_analysis_dict['last_incremental_review_timestamp'] = str(last_review['created_at'])
@@ -396,6 +528,78 @@ class PRAnalysis:
 
         return pr_analysis_dict
 
+    def export_pr_state(self):
+        # Snapshot of everything build_pr_analysis_dict needs, so it can be recomputed without refetching.
+        pr_state = {
+            'url': self.url,
+            'repo_owner': self.repo_owner,
+            'repo_name': self.repo_name,
+            'pr_number': str(self.pr_number),
+            'source_branch': self.source_branch,
+            'target_branch': self.target_branch,
+            'creation_time': str(self.creation_time),
+            'description': self.description,
+            'merge_time': str(self.merge_time),
+            'close_time': str(self.close_time),
+            'commit_shas': [commit.sha for commit in self.pr_creation_commits + self.incremental_commits],
+            'pr_creation_commit_times': [str(commit_time) for commit_time in self.pr_creation_commit_times],
+            'incremental_commit_times': [str(commit_time) for commit_time in self.incremental_commit_times],
+            'review_submissions': [],
+            'comments': []
+        }
+        for review_data in self.review_submissions:
+            pr_state['review_submissions'].append({
+                'id': review_data['id'],
+                'user': review_data['user'],
+                'state': review_data['state'],
+                'submitted_at': str(review_data['submitted_at']),
+                'reviewer': review_data['reviewer']
+            })
+        for comment in self.comments_data:
+            pr_state['comments'].append({
+                'id': comment['id'],
+                'user': comment['user'],
+                'created_at': str(comment['created_at']),
+                'updated_at': str(comment['updated_at']),
+                'path': comment['path'],
+                'commit_id': comment['commit_id'],
+                'review_id': comment.get('review_id'),
+                'reviewer': comment['reviewer']
+            })
+        return pr_state
+
+    def import_pr_state(self, pr_state):
+        self.url = pr_state['url']
+        self.repo_owner = pr_state['repo_owner']
+        self.repo_name = pr_state['repo_name']
+        self.pr_number = pr_state['pr_number']
+        self.source_branch = pr_state['source_branch']
+        self.target_branch = pr_state['target_branch']
+        self.creation_time = parse_timestamp(pr_state['creation_time'])
+        self.description = pr_state['description']
+        self.merge_time = parse_timestamp(pr_state['merge_time'])
+        self.close_time = parse_timestamp(pr_state['close_time'])
+        self.pr_creation_commit_times = [parse_timestamp(commit_time) for commit_time in pr_state['pr_creation_commit_times']]
+        self.incremental_commit_times = [parse_timestamp(commit_time) for commit_time in pr_state['incremental_commit_times']]
+
+        self.comments_data = []
+        self.num_comments = 0
+        self.ai_reviewer_num_comments = 0
+        self.review_windows = None
+        self.review_submissions = []
+        for review_data in pr_state.get('review_submissions', []):
+            review_data = dict(review_data)
+            review_data['submitted_at'] = parse_timestamp(review_data['submitted_at'])
+            self.review_submissions.append(review_data)
+        for comment in pr_state['comments']:
+            comment_data = dict(comment)
+            comment_data['created_at'] = parse_timestamp(comment['created_at'])
+            comment_data['updated_at'] = parse_timestamp(comment['updated_at'])
+            if comment_data['reviewer'] == self.ai_reviewer:
+                self.ai_reviewer_num_comments = self.ai_reviewer_num_comments + 1
+            self.num_comments = self.num_comments + 1
+            self.comments_data.append(comment_data)
+
     def build_pr_analysis_data(self, pr_url):
         if not pr_url:
             print("Failed to get PR analysis due to invalid PR URL.")
@@ -413,6 +617,8 @@ class PRAnalysis:
             print("Total incremental commits i.e. commits after PR creation: ", len(self.incremental_commits))
             #self.print_pr_commits(self.incremental_commits)
 
+            self.get_review_submissions()
+            print("Total review submissions: ", len(self.review_submissions))
             self.get_review_comments()
             print("=" * 50)
             #print(f"Total review comments: {len(self.comments_data)}")
@@ -513,32 +719,19 @@ def main():
             print('Number of PR URLs: ', len(pr_urls))
             #print('PR URLs: ', pr_urls)
 
-            pr_analysis_dict_list = []
-            for pr_url in pr_urls:
-                pr_analysis_dict = pr_analysis.build_pr_analysis_data(pr_url)
-                print(json.dumps(pr_analysis_dict, indent=2))
+            # Records go to the configured sink as they are built, one row group per batch.
+            output_format = pr_analysis.properties.get('output.format', 'csv')
+            output_dir = pr_analysis.properties.get('output.dir', '.')
+            batch_size = int(pr_analysis.properties.get('output.batch_size', '100'))
+            append = pr_analysis.properties.get('output.append', 'false').lower() == 'true'
+            with get_sink(output_format, output_dir, batch_size, append) as sink:
+                for pr_url in pr_urls:
+                    pr_analysis_dict = pr_analysis.build_pr_analysis_data(pr_url)
+                    print(json.dumps(pr_analysis_dict, indent=2))
 
-                pr_analysis_dict_list.append(pr_analysis_dict)
+                    sink.write(pr_analysis_dict)
 
-            if len(pr_analysis_dict_list) > 0:
-                batch_size = 100
-                file_name = pr_analysis.repo_owner + '-' + pr_analysis.repo_name + '.csv'
-                field_names = list(pr_analysis_dict_list[0].keys())
-        
-                with open(file_name, 'w', newline='', encoding='utf-8') as csvfile:
-                    writer = csv.DictWriter(csvfile, 
-                                    fieldnames=field_names,
-                                    delimiter=',',
-                                    quoting=csv.QUOTE_MINIMAL)
-            
-                    writer.writeheader()
-            
-                    for i in range(0, len(pr_analysis_dict_list), batch_size):
-                        batch = pr_analysis_dict_list[i:i+batch_size]
-                        writer.writerows(batch)
-                        #print(f"Wrote {i+len(batch)} rows...")
-        
-                print(f"Successfully wrote {len(pr_analysis_dict_list)} rows to {file_name}")
+            print(f"Successfully wrote {sink.num_rows} rows as {output_format} to {output_dir}")
 
         except Exception as e:
             #traceback.print_exc()
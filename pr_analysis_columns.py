@@ -0,0 +1,42 @@
+# File: pr_analysis_columns.py
+
+# Column types of the PR analysis rows, shared by the output sinks and the analytics
+# without pulling in their dependencies.
+
+NOT_AVAILABLE = 'N.A.'
+
+TIMESTAMP_COLUMNS = [
+    'creation_timestamp',
+    'merge_timestamp',
+    'close_timestamp',
+    'first_suggestion_review_timestamp',
+    'last_suggestion_review_timestamp',
+    'first_full_review_timestamp',
+    'last_full_review_timestamp',
+    'first_incremental_commit_timestamp',
+    'first_incremental_review_timestamp',
+    'last_incremental_commit_timestamp',
+    'last_incremental_review_timestamp',
+]
+
+INTEGER_COLUMNS = [
+    'num_commits_before_pr_creation',
+    'num_commits_incremental',
+    'num_comments_made_by_human',
+    'num_comments_made_by_ai',
+    'num_review_rounds',
+]
+
+STRING_COLUMNS = [
+    'url',
+    'repo_owner',
+    'repo_name',
+    'source_branch',
+    'target_branch',
+    'first_suggestion_review_type',
+    'last_suggestion_review_type',
+    'first_full_review_type',
+    'last_full_review_type',
+    'first_incremental_review_type',
+    'last_incremental_review_type',
+]
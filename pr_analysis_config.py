@@ -1,9 +1,30 @@
+import os
+import re
+
 class PRAnalysisConfig:
+    # Parsed properties per (file path, modification time), shared by every instance in the process.
+    properties_cache = {}
+
+    REQUIRED_PROPERTIES = ['git.provider', 'git.access_token', 'git.domain']
+    GIT_PROVIDERS = ['GITHUB', 'GITHUB_ENTERPRISE']
+    INTEGER_PROPERTIES = ['webhook.port', 'git.pool_size', 'output.batch_size']
+    OUTPUT_FORMATS = ['csv', 'jsonl', 'parquet']
+    BOOLEAN_PROPERTIES = ['review.comments.streaming', 'review.comments.keep_bodies', 'webhook.fetch_missing', 'output.append']
+
     def __init__(self, file_path):
         self.file_path = file_path
         self.properties = {}
+        self.errors = []
 
     def read_properties(self):
+        try:
+            cache_key = (os.path.abspath(self.file_path), os.path.getmtime(self.file_path))
+        except OSError:
+            cache_key = None
+        if cache_key in PRAnalysisConfig.properties_cache:
+            self.properties = dict(PRAnalysisConfig.properties_cache[cache_key])
+            return self.properties
+
         try:
             with open(self.file_path, 'r') as file:
                 for line in file:
@@ -14,6 +35,7 @@ class PRAnalysisConfig:
                         key, value = line.split('=', 1)
                         # Store in dictionary after removing leading/trailing spaces
                         self.properties[key.strip()] = value.strip()
+            PRAnalysisConfig.properties_cache[cache_key] = dict(self.properties)
         except FileNotFoundError:
             print(f"Error: File {self.file_path} not found")
             self.properties = {}
@@ -23,17 +45,60 @@ class PRAnalysisConfig:
 
         return self.properties
 
+    def validate_properties(self):
+        self.errors = []
+        if not self.properties:
+            self.errors.append(f"No properties read from {self.file_path}")
+            return False
+
+        for key in PRAnalysisConfig.REQUIRED_PROPERTIES:
+            if not self.properties.get(key):
+                self.errors.append(f"Missing required property: {key}")
+
+        git_provider = self.properties.get('git.provider', '')
+        if git_provider and git_provider not in PRAnalysisConfig.GIT_PROVIDERS:
+            self.errors.append(f"Invalid git.provider: {git_provider}")
+
+        git_domain = self.properties.get('git.domain', '')
+        if git_domain and not re.match(r'https?://[^/]+', git_domain):
+            self.errors.append(f"Invalid git.domain: {git_domain}")
+
+        ai_reviewer_regex = self.properties.get('ai.reviewer.regex', '')
+        if ai_reviewer_regex:
+            try:
+                re.compile(ai_reviewer_regex)
+            except re.error as e:
+                self.errors.append(f"Invalid ai.reviewer.regex: {e}")
+
+        output_format = self.properties.get('output.format')
+        if output_format is not None and output_format not in PRAnalysisConfig.OUTPUT_FORMATS:
+            self.errors.append(f"Invalid output.format: {output_format}")
+
+        for key in PRAnalysisConfig.INTEGER_PROPERTIES:
+            value = self.properties.get(key)
+            if value is not None and not value.isdigit():
+                self.errors.append(f"Invalid integer property {key}: {value}")
+
+        for key in PRAnalysisConfig.BOOLEAN_PROPERTIES:
+            value = self.properties.get(key)
+            if value is not None and value.lower() not in ('true', 'false'):
+                self.errors.append(f"Invalid boolean property {key}: {value}")
+
+        for error in self.errors:
+            print(f"Error: {error}")
+        return len(self.errors) == 0
+
 # Example usage:
 if __name__ == "__main__":
     # Create an instance of PRAnalysisConfig
     pr_analysis_config = PRAnalysisConfig('pr_analysis.properties')
-    
+
     # Read the properties
     properties_dict = pr_analysis_config.read_properties()
-    
+
     # Print the resulting dictionary
     if properties_dict:
         print("Properties Dictionary:")
         for key, value in properties_dict.items():
             print(f"{key}: {value}")
-
+        print("Properties are valid: ", pr_analysis_config.validate_properties())
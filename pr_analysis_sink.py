@@ -0,0 +1,302 @@
+# File: pr_analysis_sink.py
+
+import abc
+import csv
+import glob
+import json
+import os
+import shutil
+import uuid
+from datetime import datetime
+from pr_analysis_columns import NOT_AVAILABLE, TIMESTAMP_COLUMNS, INTEGER_COLUMNS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+def get_repo_key(record):
+    return record.get('repo_owner', '') + '-' + record.get('repo_name', '')
+
+def to_typed_timestamp(value):
+    # 'N.A.' and empty cells become nulls instead of strings in typed outputs.
+    if not value or value == NOT_AVAILABLE or value == 'None':
+        return None
+    return datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+
+def to_typed_integer(value):
+    if value is None or value == '' or value == NOT_AVAILABLE:
+        return None
+    return int(value)
+
+class PRAnalysisSink(abc.ABC):
+    def __init__(self, output_dir='.', batch_size=100, append=False):
+        self.output_dir = output_dir
+        self.batch_size = batch_size
+        # Output is split into partitions (a file per repo, or a repo=/month= directory for
+        # Parquet). Without append, a partition's earlier output is removed the first time the
+        # run writes to it, and partitions the run does not touch are kept. In both modes a
+        # PR keeps one row: a newer row for a url replaces the stored one, so a rerun
+        # refreshes PRs that were merged or reviewed since.
+        self.append = append
+        self.partition_urls = {}
+        self.run_urls = set()
+        self.buffer = []
+        self.num_rows = 0
+        os.makedirs(self.output_dir, exist_ok=True)
+
+    def write(self, record):
+        # Records are buffered and written one row group at a time.
+        if not record:
+            return
+        self.buffer.append(record)
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def write_all(self, records):
+        for record in records:
+            self.write(record)
+
+    def flush(self):
+        if not self.buffer:
+            return
+        rows_by_partition = {}
+        for row in self.buffer:
+            # A later row for the same url within the batch wins.
+            rows_by_partition.setdefault(self.get_partition(row), {})[row.get('url')] = row
+
+        for partition, rows in rows_by_partition.items():
+            urls = self.get_partition_urls(partition)
+            replaced = {}
+            for url in rows:
+                if url in urls:
+                    replaced.setdefault(urls.pop(url), set()).add(url)
+            for location, location_urls in replaced.items():
+                self.remove_urls(partition, location, location_urls)
+            location = self.write_rows(partition, list(rows.values()))
+            for url in rows:
+                urls[url] = location
+            self.run_urls.update(rows)
+        self.num_rows = len(self.run_urls)
+        self.buffer = []
+
+    def get_partition_urls(self, partition):
+        # url -> file holding its row, loaded on the first write to the partition.
+        if partition not in self.partition_urls:
+            if self.append:
+                self.partition_urls[partition] = self.read_urls(partition)
+            else:
+                self.remove_partition(partition)
+                self.partition_urls[partition] = {}
+        return self.partition_urls[partition]
+
+    def get_partition(self, row):
+        return get_repo_key(row)
+
+    @abc.abstractmethod
+    def write_rows(self, partition, rows):
+        # Writes the rows of one partition and returns the file they went to.
+        pass
+
+    @abc.abstractmethod
+    def read_urls(self, partition):
+        pass
+
+    @abc.abstractmethod
+    def remove_partition(self, partition):
+        pass
+
+    @abc.abstractmethod
+    def remove_urls(self, partition, location, urls):
+        pass
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+class CSVSink(PRAnalysisSink):
+    def get_file_name(self, repo_key):
+        return os.path.join(self.output_dir, repo_key + '.csv')
+
+    def read_urls(self, repo_key):
+        file_name = self.get_file_name(repo_key)
+        if not os.path.exists(file_name):
+            return {}
+        with open(file_name, 'r', newline='', encoding='utf-8') as csvfile:
+            return {row.get('url'): file_name for row in csv.DictReader(csvfile)}
+
+    def remove_partition(self, repo_key):
+        if os.path.exists(self.get_file_name(repo_key)):
+            os.remove(self.get_file_name(repo_key))
+
+    def remove_urls(self, repo_key, file_name, urls):
+        # Rewritten through a temporary file so an interrupted run keeps the old rows.
+        with open(file_name, 'r', newline='', encoding='utf-8') as csvfile, \
+                open(file_name + '.tmp', 'w', newline='', encoding='utf-8') as tmpfile:
+            reader = csv.reader(csvfile)
+            writer = csv.writer(tmpfile, delimiter=',', quoting=csv.QUOTE_MINIMAL)
+            field_names = next(reader, [])
+            writer.writerow(field_names)
+            url_index = field_names.index('url')
+            for row in reader:
+                if row[url_index] not in urls:
+                    writer.writerow(row)
+        os.replace(file_name + '.tmp', file_name)
+
+    def write_rows(self, repo_key, rows):
+        file_name = self.get_file_name(repo_key)
+        # Appending keeps the header of the existing file so incremental runs stay readable.
+        field_names = None
+        if os.path.exists(file_name) and os.path.getsize(file_name) > 0:
+            with open(file_name, 'r', newline='', encoding='utf-8') as csvfile:
+                field_names = next(csv.reader(csvfile), None)
+        is_new_file = field_names is None
+        if is_new_file:
+            field_names = list(rows[0].keys())
+
+        with open(file_name, 'a', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile,
+                            fieldnames=field_names,
+                            delimiter=',',
+                            quoting=csv.QUOTE_MINIMAL,
+                            restval='N.A.',
+                            extrasaction='ignore')
+            if is_new_file:
+                writer.writeheader()
+            writer.writerows(rows)
+        return file_name
+
+class JSONLSink(PRAnalysisSink):
+    def get_file_name(self, repo_key):
+        return os.path.join(self.output_dir, repo_key + '.jsonl')
+
+    def read_urls(self, repo_key):
+        file_name = self.get_file_name(repo_key)
+        if not os.path.exists(file_name):
+            return {}
+        urls = {}
+        with open(file_name, 'r', encoding='utf-8') as jsonl_file:
+            for line in jsonl_file:
+                if line.strip():
+                    urls[json.loads(line).get('url')] = file_name
+        return urls
+
+    def remove_partition(self, repo_key):
+        if os.path.exists(self.get_file_name(repo_key)):
+            os.remove(self.get_file_name(repo_key))
+
+    def remove_urls(self, repo_key, file_name, urls):
+        with open(file_name, 'r', encoding='utf-8') as jsonl_file, \
+                open(file_name + '.tmp', 'w', encoding='utf-8') as tmp_file:
+            for line in jsonl_file:
+                if line.strip() and json.loads(line).get('url') not in urls:
+                    tmp_file.write(line)
+        os.replace(file_name + '.tmp', file_name)
+
+    def write_rows(self, repo_key, rows):
+        file_name = self.get_file_name(repo_key)
+        with open(file_name, 'a', encoding='utf-8') as jsonl_file:
+            for row in rows:
+                jsonl_file.write(json.dumps(row, default=str) + '\n')
+        return file_name
+
+class ParquetSink(PRAnalysisSink):
+    def __init__(self, output_dir='.', batch_size=100, append=False):
+        if pa is None:
+            raise ValueError("The parquet output format requires the pyarrow package")
+        super().__init__(output_dir, batch_size, append)
+        # Parquet files are immutable, so each run writes new part files per repo=/month=
+        # partition and every flush appends a row group to the open one; the run id keeps
+        # incremental runs from overwriting earlier parts. Replacing a row rewrites the
+        # part holding it, closing it first if it is this run's open part.
+        self.run_id = uuid.uuid4().hex
+        self.num_parts = 0
+        self.writers = {}
+
+    def get_partition(self, row):
+        creation_time = to_typed_timestamp(row.get('creation_timestamp'))
+        month = creation_time.strftime('%Y-%m') if creation_time else 'unknown'
+        return (get_repo_key(row), month)
+
+    def get_partition_dir(self, partition):
+        repo_key, month = partition
+        return os.path.join(self.output_dir, f"repo={repo_key}", f"month={month}")
+
+    def read_urls(self, partition):
+        urls = {}
+        for file_name in sorted(glob.glob(os.path.join(self.get_partition_dir(partition), '*.parquet'))):
+            for url in pq.ParquetFile(file_name).read(columns=['url']).column('url').to_pylist():
+                urls[url] = file_name
+        return urls
+
+    def remove_partition(self, partition):
+        shutil.rmtree(self.get_partition_dir(partition), ignore_errors=True)
+
+    def remove_urls(self, partition, file_name, urls):
+        writer = self.writers.get(partition)
+        if writer is not None and writer[1] == file_name:
+            writer[0].close()
+            del self.writers[partition]
+        table = pq.ParquetFile(file_name).read()
+        keep = [url not in urls for url in table.column('url').to_pylist()]
+        if not any(keep):
+            os.remove(file_name)
+            return
+        pq.write_table(table.filter(pa.array(keep)), file_name + '.tmp')
+        os.replace(file_name + '.tmp', file_name)
+
+    def get_schema(self, field_names):
+        fields = []
+        for name in field_names:
+            if name in TIMESTAMP_COLUMNS:
+                fields.append(pa.field(name, pa.timestamp('s', tz='UTC')))
+            elif name in INTEGER_COLUMNS:
+                fields.append(pa.field(name, pa.int64()))
+            else:
+                fields.append(pa.field(name, pa.string()))
+        return pa.schema(fields)
+
+    def get_writer(self, partition, field_names):
+        if partition not in self.writers:
+            partition_dir = self.get_partition_dir(partition)
+            os.makedirs(partition_dir, exist_ok=True)
+            self.num_parts = self.num_parts + 1
+            file_name = os.path.join(partition_dir, f"part-{self.run_id}-{self.num_parts}.parquet")
+            self.writers[partition] = (pq.ParquetWriter(file_name, self.get_schema(field_names)), file_name)
+        return self.writers[partition]
+
+    def write_rows(self, partition, rows):
+        writer, file_name = self.get_writer(partition, list(rows[0].keys()))
+        columns = {}
+        for name in writer.schema.names:
+            values = [row.get(name) for row in rows]
+            if name in TIMESTAMP_COLUMNS:
+                columns[name] = [to_typed_timestamp(value) for value in values]
+            elif name in INTEGER_COLUMNS:
+                columns[name] = [to_typed_integer(value) for value in values]
+            else:
+                columns[name] = [None if value is None else str(value) for value in values]
+        writer.write_table(pa.table(columns, schema=writer.schema))
+        return file_name
+
+    def close(self):
+        super().close()
+        for writer, file_name in self.writers.values():
+            writer.close()
+        self.writers = {}
+
+def get_sink(output_format='csv', output_dir='.', batch_size=100, append=False):
+    if output_format == 'csv':
+        return CSVSink(output_dir, batch_size, append)
+    elif output_format == 'jsonl':
+        return JSONLSink(output_dir, batch_size, append)
+    elif output_format == 'parquet':
+        return ParquetSink(output_dir, batch_size, append)
+    raise ValueError(f"Invalid output format: {output_format}")
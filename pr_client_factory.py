@@ -0,0 +1,86 @@
+# File: pr_client_factory.py
+
+import os
+import re
+from github import Github
+from pr_analysis_config import PRAnalysisConfig
+from pr_patch_store import PRPatchStore
+
+# One factory per (properties file, process); worker processes build their own on first use.
+client_factories = {}
+
+def get_client_factory(properties_file='pr_analysis.properties'):
+    cache_key = (os.path.abspath(properties_file), os.getpid())
+    if cache_key not in client_factories:
+        client_factories[cache_key] = PRClientFactory(properties_file)
+    return client_factories[cache_key]
+
+class PRClientFactory:
+    def __init__(self, properties_file='pr_analysis.properties'):
+        self.properties_file = properties_file
+        self.pr_analysis_config = PRAnalysisConfig(properties_file)
+        self.properties = self.pr_analysis_config.read_properties()
+        self.is_valid_config = self.pr_analysis_config.validate_properties()
+        self.github = None
+        self.patch_store = None
+
+        self.git_provider = self.properties.get('git.provider', '')
+        self.git_access_token = self.properties.get('git.access_token', '')
+        self.git_domain = self.properties.get('git.domain', '').rstrip('/')
+        self.pool_size = int(self.properties.get('git.pool_size', '0') or 0) if self.is_valid_config else 0
+        if self.git_provider.endswith("ENTERPRISE"):
+            self.base_url = self.git_domain + "/api/v3"
+            self.api_url = self.base_url
+        else:
+            self.base_url = self.git_domain
+            self.api_url = "https://api.github.com"
+
+        # Escape special characters in domain to handle domains that might contain them
+        escaped_domain = re.escape(self.git_domain)
+        self.pr_url_pattern = re.compile(fr"{escaped_domain}/([^/]+)/([^/]+)/pull/(\d+)")
+        self.repo_url_pattern = re.compile(fr"{escaped_domain}/([^/]+)/([^/]+)")
+
+    def __getstate__(self):
+        # Clients hold sockets and mmaps, so a pickled factory is rebuilt lazily in the worker.
+        state = self.__dict__.copy()
+        state['github'] = None
+        state['patch_store'] = None
+        return state
+
+    def get_github(self):
+        if self.github is None:
+            kwargs = {}
+            if self.pool_size:
+                kwargs['pool_size'] = self.pool_size
+            if self.git_provider.endswith("ENTERPRISE"):
+                self.github = Github(base_url=self.base_url, login_or_token=self.git_access_token, **kwargs)
+            else:
+                self.github = Github(self.git_access_token, **kwargs)
+            print("Created the github instance.")
+        return self.github
+
+    def get_patch_store(self):
+        patch_store_dir = self.properties.get('patch.store_dir', '')
+        if self.patch_store is None and patch_store_dir:
+            self.patch_store = PRPatchStore(patch_store_dir)
+        return self.patch_store
+
+    def get_api_headers(self):
+        return {
+            "Authorization": f"token {self.git_access_token}",
+            "Accept": "application/vnd.github.v3+json"
+        }
+
+    def parse_pr_url(self, pr_url):
+        match = self.pr_url_pattern.match(pr_url)
+        if match:
+            return match.groups()
+        else:
+            raise ValueError("Invalid PR URL format")
+
+    def parse_repo_url(self, repo_url):
+        match = self.repo_url_pattern.match(repo_url)
+        if match:
+            return match.groups()
+        else:
+            raise ValueError("Invalid Repo URL format")
@@ -1,18 +1,11 @@
-from github import Github
 from datetime import datetime
 import pytz
-import re
+from pr_client_factory import get_client_factory
 
-# Replace with your GitHub personal access token
-TOKEN = "TOKEN"
-
-def parse_pr_url(url):
-    pattern = r"https://github.com/([^/]+)/([^/]+)/pull/(\d+)"
-    match = re.match(pattern, url)
-    if match:
-        return match.groups()
-    else:
-        raise ValueError("Invalid PR URL format")
+def parse_pr_url(url, client_factory=None):
+    if client_factory is None:
+        client_factory = get_client_factory()
+    return client_factory.parse_pr_url(url)
 
 def get_pr_and_commits(repo, pr_number):
     pr = repo.get_pull(pr_number)
@@ -31,10 +24,15 @@ def get_commits_after_creation(commits, creation_time):
 
 def main():
     try:
+        client_factory = get_client_factory()
+        if not client_factory.is_valid_config:
+            print("PR commits cannot be retrieved because of invalid configuration.")
+            return
+
         pr_url = input("Enter the GitHub PR URL: ")
-        repo_owner, repo_name, pr_number = parse_pr_url(pr_url)
-        
-        g = Github(TOKEN)
+        repo_owner, repo_name, pr_number = parse_pr_url(pr_url, client_factory)
+
+        g = client_factory.get_github()
         repo = g.get_repo(f"{repo_owner}/{repo_name}")
         
         pr, creation_time, commits = get_pr_and_commits(repo, int(pr_number))
@@ -43,21 +41,28 @@ def main():
         commits_after_creation = get_commits_after_creation(commits, creation_time)
         print(f"Number of commits after PR creation: {len(commits_after_creation)}")
         
+        patch_store = client_factory.get_patch_store()
         for commit in commits_after_creation:
             print(f"Commit SHA: {commit.sha}")
             print(f"Author: {commit.commit.author.name} <{commit.commit.author.email}>")
             print(f"HTML URL: {commit.html_url}")
             print(f"Commit message: {commit.commit.message}")
             print(f"Commit time: {commit.commit.committer.date}")
+            if patch_store:
+                stats = patch_store.get_commit_stats(commit)
+                files = patch_store.get_commit_files(commit)
+            else:
+                stats = commit.stats
+                files = commit.files
             # Print detailed stats
             print("\nStats:")
-            if commit.stats:
-                print(f"Additions: {commit.stats.additions}")
-                print(f"Deletions: {commit.stats.deletions}")
-                print(f"Total changes: {commit.stats.total}")
+            if stats:
+                print(f"Additions: {stats.additions}")
+                print(f"Deletions: {stats.deletions}")
+                print(f"Total changes: {stats.total}")
             # Print files changed
             print("\nFiles changed:")
-            for file in commit.files:
+            for file in files:
                 print(f"- {file.filename} ({file.status})")
                 print(f"  Changes: +{file.additions} -{file.deletions}")
             print("---")
@@ -0,0 +1,179 @@
+# File: pr_patch_store.py
+
+import fcntl
+import hashlib
+import json
+import mmap
+import os
+import zlib
+
+class StoredFile:
+    # Same attributes as the github File objects the scripts read, with the patch loaded on demand.
+    def __init__(self, patch_store, entry):
+        self.patch_store = patch_store
+        self.filename = entry['filename']
+        self.status = entry['status']
+        self.additions = entry['additions']
+        self.deletions = entry['deletions']
+        self.changes = entry['changes']
+        self.sha = entry['sha']
+        self.patch_key = entry['patch_key']
+
+    @property
+    def patch(self):
+        if not self.patch_key:
+            return None
+        return self.patch_store.get_patch(self.patch_key)
+
+class StoredCommitStats:
+    def __init__(self, stats):
+        self.additions = stats['additions']
+        self.deletions = stats['deletions']
+        self.total = stats['total']
+
+class PRPatchStore:
+    def __init__(self, store_dir='pr_patch_store'):
+        self.store_dir = store_dir
+        os.makedirs(self.store_dir, exist_ok=True)
+        # Patches are appended zlib-compressed to one pack file; the index log maps
+        # patch hashes to (offset, length) and commits / PR heads to their file lists.
+        self.pack_file = os.path.join(self.store_dir, 'patches.pack')
+        self.index_file = os.path.join(self.store_dir, 'index.jsonl')
+        self.lock_file = os.path.join(self.store_dir, 'store.lock')
+        self.patches = {}
+        self.file_lists = {}
+        self.index_offset = 0
+        self.pack_map = None
+        self.pack_map_size = 0
+
+        open(self.pack_file, 'ab').close()
+        self.load_index()
+
+    def load_index(self):
+        # Reads only the records appended since the last call, including those written by other processes.
+        if not os.path.exists(self.index_file):
+            return
+        with open(self.index_file, 'rb') as index:
+            index.seek(self.index_offset)
+            for line in index:
+                if not line.endswith(b'\n'):
+                    break
+                self.index_offset = self.index_offset + len(line)
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                if 'patch' in record:
+                    self.patches[record['patch']] = (record['offset'], record['length'])
+                else:
+                    self.file_lists[record['files']] = record
+
+    def lock(self):
+        # Writers in other processes share the pack and index, so appends are serialised with an flock.
+        lock = open(self.lock_file, 'a')
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        return lock
+
+    def unlock(self, lock):
+        fcntl.flock(lock, fcntl.LOCK_UN)
+        lock.close()
+
+    def append_index(self, record):
+        with open(self.index_file, 'a', encoding='utf-8') as index:
+            index.write(json.dumps(record) + '\n')
+
+    def put_patch(self, patch):
+        patch_bytes = patch.encode('utf-8')
+        patch_key = hashlib.sha256(patch_bytes).hexdigest()
+        if patch_key in self.patches:
+            return patch_key
+
+        compressed = zlib.compress(patch_bytes)
+        lock = self.lock()
+        try:
+            self.load_index()
+            if patch_key in self.patches:
+                return patch_key
+            with open(self.pack_file, 'ab') as pack:
+                pack.write(compressed)
+                offset = pack.tell() - len(compressed)
+            self.append_index({'patch': patch_key, 'offset': offset, 'length': len(compressed)})
+            self.load_index()
+        finally:
+            self.unlock(lock)
+        return patch_key
+
+    def get_patch(self, patch_key):
+        if patch_key not in self.patches:
+            self.load_index()
+        offset, length = self.patches[patch_key]
+        # Remap only when the pack has grown past the current mapping.
+        if self.pack_map is None or offset + length > self.pack_map_size:
+            if self.pack_map is not None:
+                self.pack_map.close()
+            with open(self.pack_file, 'rb') as pack:
+                self.pack_map = mmap.mmap(pack.fileno(), 0, access=mmap.ACCESS_READ)
+            self.pack_map_size = len(self.pack_map)
+        return zlib.decompress(self.pack_map[offset:offset + length]).decode('utf-8')
+
+    def put_files(self, key, files, stats=None):
+        entries = []
+        for file in files:
+            entries.append({
+                'filename': file.filename,
+                'status': file.status,
+                'additions': file.additions,
+                'deletions': file.deletions,
+                'changes': file.changes,
+                'sha': file.sha,
+                'patch_key': self.put_patch(file.patch) if file.patch else None
+            })
+        record = {'files': key, 'entries': entries}
+        if stats:
+            record['stats'] = {'additions': stats.additions, 'deletions': stats.deletions, 'total': stats.total}
+        lock = self.lock()
+        try:
+            self.load_index()
+            if key not in self.file_lists:
+                self.append_index(record)
+                self.load_index()
+        finally:
+            self.unlock(lock)
+        return self.file_lists[key]
+
+    def get_file_list(self, key):
+        record = self.file_lists.get(key)
+        if record is None:
+            self.load_index()
+            record = self.file_lists.get(key)
+        return record
+
+    def get_commit_record(self, commit):
+        # A commit SHA fixes its diff, so it is fetched at most once across PRs and runs.
+        record = self.get_file_list(commit.sha)
+        if record is None:
+            record = self.put_files(commit.sha, commit.files, commit.stats)
+        return record
+
+    def get_commit_files(self, commit):
+        return [StoredFile(self, entry) for entry in self.get_commit_record(commit)['entries']]
+
+    def get_commit_stats(self, commit):
+        record = self.get_commit_record(commit)
+        if 'stats' not in record:
+            return None
+        return StoredCommitStats(record['stats'])
+
+    def get_pr_files(self, pr):
+        # The PR diff only changes when the head moves, so key it by repo, PR number and head SHA.
+        key = f"{pr.base.repo.full_name}#{pr.number}@{pr.head.sha}"
+        record = self.get_file_list(key)
+        if record is None:
+            record = self.put_files(key, pr.get_files())
+        return [StoredFile(self, entry) for entry in record['entries']]
+
+    def close(self):
+        if self.pack_map is not None:
+            self.pack_map.close()
+            self.pack_map = None
+            self.pack_map_size = 0
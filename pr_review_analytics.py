@@ -0,0 +1,344 @@
+# File: pr_review_analytics.py
+
+import csv
+import sys
+import numpy as np
+from pr_analysis_columns import NOT_AVAILABLE, TIMESTAMP_COLUMNS, INTEGER_COLUMNS, STRING_COLUMNS
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+    pa_csv = None
+
+GROUP_KEYS = ('repo', 'branch', 'week')
+DEFAULT_PERCENTILES = (50, 75, 90, 95)
+
+
+def parse_timestamp_column(values):
+    # Cells look like str(datetime), e.g. '2024-10-01 12:34:56+00:00' or '...-04:00'.
+    # The first 19 characters are parsed by NumPy in one call and a trailing
+    # '+HH:MM' / '-HH:MM' offset is read from the UTF-32 code points and subtracted,
+    # so every value ends up in UTC; values without an offset are taken as UTC and
+    # 'N.A.' and empty cells become NaT.
+    raw = np.asarray(values, dtype='U32')
+    mask = (raw != NOT_AVAILABLE) & (raw != '') & (raw != 'None')
+    parsed = np.where(mask, raw.astype('U19'), 'NaT').astype('datetime64[s]')
+
+    if len(raw):
+        # Only the last six code points of each cell are gathered from the uint32 view.
+        code_points = raw.view(np.uint32).reshape(len(raw), -1)
+        offset_start = np.maximum(np.char.str_len(raw) - 6, 0)
+        tail = code_points[np.arange(len(raw))[:, None], offset_start[:, None] + np.arange(6)].astype(np.int64)
+        sign = tail[:, 0]
+        has_offset = mask & ((sign == ord('+')) | (sign == ord('-'))) & (tail[:, 3] == ord(':'))
+        digits = [tail[:, i] - ord('0') for i in (1, 2, 4, 5)]
+        offset_seconds = (digits[0] * 10 + digits[1]) * 3600 + (digits[2] * 10 + digits[3]) * 60
+        offset_seconds = np.where(has_offset, np.where(sign == ord('-'), -offset_seconds, offset_seconds), 0)
+        parsed = parsed - offset_seconds.astype('timedelta64[s]')
+    return parsed, mask
+
+
+def arrow_timestamp_column(column):
+    # Arrow converts whole columns that consistently carry an offset, or consistently lack one
+    # (naive values are UTC); a column mixing both goes through the NumPy parser.
+    mask = column.is_valid().to_numpy(zero_copy_only=False)
+    for timestamp_type in (pa.timestamp('us', tz='UTC'), pa.timestamp('us')):
+        try:
+            return column.cast(timestamp_type).to_numpy().astype('datetime64[s]'), mask
+        except pa.ArrowInvalid:
+            continue
+    return parse_timestamp_column(column.fill_null(NOT_AVAILABLE).to_numpy(zero_copy_only=False))
+
+
+def parse_integer_column(values):
+    raw = np.asarray(values, dtype=str)
+    mask = np.char.isdigit(raw)
+    parsed = np.zeros(len(raw), dtype=np.int64)
+    if mask.any():
+        parsed[mask] = raw[mask].astype(np.int64)
+    return parsed, mask
+
+
+def week_start(timestamps):
+    # Monday of the ISO week; day 0 (1970-01-01) was a Thursday. NaT stays NaT.
+    days = timestamps.astype('datetime64[D]').astype(np.int64)
+    weeks = (days - (days + 3) % 7).astype('datetime64[D]')
+    return np.where(np.isnat(timestamps), np.datetime64('NaT', 'D'), weeks)
+
+
+def grouped_percentiles(codes, values, percentiles=DEFAULT_PERCENTILES):
+    # Sort once by (group, value) and interpolate every percentile of every group
+    # from the sorted array, so the cost is a single O(n log n) sort.
+    order = np.lexsort((values, codes))
+    sorted_codes = codes[order]
+    sorted_values = values[order]
+    group_codes, starts, counts = np.unique(sorted_codes, return_index=True, return_counts=True)
+    ends = starts + counts - 1
+
+    result = np.empty((len(group_codes), len(percentiles)), dtype=np.float64)
+    for j, q in enumerate(percentiles):
+        position = starts + (q / 100.0) * (counts - 1)
+        low = np.floor(position).astype(np.int64)
+        high = np.minimum(low + 1, ends)
+        fraction = position - low
+        result[:, j] = sorted_values[low] + (sorted_values[high] - sorted_values[low]) * fraction
+
+    means = np.add.reduceat(sorted_values, starts) / counts if len(starts) else np.empty(0)
+    return group_codes, counts, means, result
+
+
+class PRReviewAnalytics:
+    def __init__(self, columns=None):
+        self.columns = {}
+        self.masks = {}
+        self.num_rows = 0
+        if columns:
+            self.load_columns(columns)
+
+    def load_columns(self, columns):
+        self.num_rows = len(next(iter(columns.values()))) if columns else 0
+        self.columns = {}
+        self.masks = {}
+
+        for name in TIMESTAMP_COLUMNS:
+            if name in columns:
+                self.columns[name], self.masks[name] = parse_timestamp_column(columns[name])
+
+        for name in INTEGER_COLUMNS:
+            if name in columns:
+                self.columns[name], self.masks[name] = parse_integer_column(columns[name])
+
+        for name in STRING_COLUMNS:
+            if name in columns:
+                self.columns[name] = np.asarray(columns[name], dtype=str)
+                self.masks[name] = self.columns[name] != NOT_AVAILABLE
+
+        self.fill_missing_columns()
+        self.add_group_columns()
+
+    def fill_missing_columns(self):
+        # Columns missing from the input are filled directly instead of parsing 'N.A.' per row.
+        for name in TIMESTAMP_COLUMNS:
+            if name not in self.columns:
+                self.columns[name] = np.full(self.num_rows, np.datetime64('NaT'), dtype='datetime64[s]')
+                self.masks[name] = np.zeros(self.num_rows, dtype=bool)
+
+        for name in INTEGER_COLUMNS:
+            if name not in self.columns:
+                self.columns[name] = np.zeros(self.num_rows, dtype=np.int64)
+                self.masks[name] = np.zeros(self.num_rows, dtype=bool)
+
+        for name in STRING_COLUMNS:
+            if name not in self.columns:
+                self.columns[name] = np.full(self.num_rows, NOT_AVAILABLE)
+                self.masks[name] = np.zeros(self.num_rows, dtype=bool)
+
+    def add_group_columns(self):
+        self.columns['repo'] = np.char.add(np.char.add(self.columns['repo_owner'], '/'), self.columns['repo_name'])
+        self.columns['branch'] = self.columns['target_branch']
+        self.columns['week'] = week_start(self.columns['creation_timestamp'])
+
+    def load_arrow_csv(self, file_name):
+        # Arrow parses the wanted columns natively (typed, offsets applied, 'N.A.' as null),
+        # which keeps millions of rows within seconds.
+        with open(file_name, 'r', newline='', encoding='utf-8') as csvfile:
+            header = next(csv.reader(csvfile), [])
+        column_types = {}
+        # Timestamps are read as text and converted per column, since older rows may lack an offset.
+        for name in TIMESTAMP_COLUMNS:
+            column_types[name] = pa.string()
+        for name in INTEGER_COLUMNS:
+            column_types[name] = pa.int64()
+        for name in STRING_COLUMNS:
+            column_types[name] = pa.string()
+        wanted = [name for name in column_types if name in header]
+        convert_options = pa_csv.ConvertOptions(
+            include_columns=wanted,
+            column_types={name: column_types[name] for name in wanted},
+            null_values=[NOT_AVAILABLE, '', 'None'],
+            strings_can_be_null=True)
+        # Descriptions are free text, so quoted cells may span lines.
+        parse_options = pa_csv.ParseOptions(newlines_in_values=True)
+        table = pa_csv.read_csv(file_name, parse_options=parse_options, convert_options=convert_options)
+        self.num_rows = table.num_rows
+        self.columns = {}
+        self.masks = {}
+
+        for name in TIMESTAMP_COLUMNS + INTEGER_COLUMNS + STRING_COLUMNS:
+            if name not in wanted:
+                continue
+            column = table.column(name)
+            if name in TIMESTAMP_COLUMNS:
+                self.columns[name], self.masks[name] = arrow_timestamp_column(column)
+            elif name in INTEGER_COLUMNS:
+                self.masks[name] = column.is_valid().to_numpy(zero_copy_only=False)
+                self.columns[name] = column.fill_null(0).to_numpy().astype(np.int64)
+            else:
+                self.columns[name] = column.fill_null(NOT_AVAILABLE).to_numpy(zero_copy_only=False).astype(str)
+                self.masks[name] = self.columns[name] != NOT_AVAILABLE
+        self.fill_missing_columns()
+        self.add_group_columns()
+
+    def load_csv(self, file_name):
+        if pa_csv is not None:
+            self.load_arrow_csv(file_name)
+            print(f"Loaded {self.num_rows} PR analysis rows from {file_name}")
+            return
+
+        columns = {}
+        csv.field_size_limit(sys.maxsize)
+        with open(file_name, 'r', newline='', encoding='utf-8') as csvfile:
+            reader = csv.reader(csvfile)
+            header = next(reader, [])
+            wanted = [(i, name) for i, name in enumerate(header)
+                      if name in TIMESTAMP_COLUMNS or name in INTEGER_COLUMNS or name in STRING_COLUMNS]
+            for _, name in wanted:
+                columns[name] = []
+            for row in reader:
+                for i, name in wanted:
+                    columns[name].append(row[i] if i < len(row) else NOT_AVAILABLE)
+        self.load_columns(columns)
+        print(f"Loaded {self.num_rows} PR analysis rows from {file_name}")
+
+    def load_records(self, pr_analysis_dict_list):
+        columns = {}
+        for name in TIMESTAMP_COLUMNS + INTEGER_COLUMNS + STRING_COLUMNS:
+            if any(name in record for record in pr_analysis_dict_list):
+                columns[name] = [str(record.get(name, NOT_AVAILABLE)) for record in pr_analysis_dict_list]
+        self.load_columns(columns)
+
+    def latency_seconds(self, end_column, start_column):
+        mask = self.masks[end_column] & self.masks[start_column]
+        latency = (self.columns[end_column] - self.columns[start_column]).astype(np.float64)
+        return latency, mask
+
+    def time_to_first_review(self):
+        return self.latency_seconds('first_suggestion_review_timestamp', 'creation_timestamp')
+
+    def response_latencies(self):
+        # One sample per review window: the full review answers the PR creation and
+        # the incremental reviews answer the first and last incremental commits.
+        windows = [
+            ('first_full_review_timestamp', 'creation_timestamp', 'first_full_review_type'),
+            ('first_incremental_review_timestamp', 'first_incremental_commit_timestamp', 'first_incremental_review_type'),
+            ('last_incremental_review_timestamp', 'last_incremental_commit_timestamp', 'last_incremental_review_type'),
+        ]
+        latencies = []
+        masks = []
+        reviewer_types = []
+        rows = []
+        for end_column, start_column, type_column in windows:
+            latency, mask = self.latency_seconds(end_column, start_column)
+            if end_column.startswith('last_incremental'):
+                # A single incremental commit opens only one incremental window.
+                mask = mask & (self.columns['last_incremental_commit_timestamp'] != self.columns['first_incremental_commit_timestamp'])
+            latencies.append(latency)
+            masks.append(mask)
+            reviewer_types.append(self.columns[type_column])
+            rows.append(np.arange(self.num_rows))
+        return (np.concatenate(latencies), np.concatenate(masks),
+                np.concatenate(reviewer_types), np.concatenate(rows))
+
+    def review_rounds(self):
+        if self.masks['num_review_rounds'].any():
+            return self.columns['num_review_rounds'].astype(np.float64), self.masks['num_review_rounds']
+
+        # Older CSVs have no round count, so count the review windows that got a review.
+        rounds = self.masks['first_full_review_timestamp'].astype(np.int64)
+        rounds += self.masks['first_incremental_review_timestamp']
+        rounds += (self.masks['last_incremental_review_timestamp'] &
+                   (self.columns['last_incremental_commit_timestamp'] != self.columns['first_incremental_commit_timestamp']))
+        return rounds.astype(np.float64), self.masks['creation_timestamp'].copy()
+
+    def group_codes(self, group_by, rows=None):
+        # Fold the group-by keys into one int64 code per row using mixed radix encoding.
+        if rows is None:
+            rows = np.arange(self.num_rows)
+        codes = np.zeros(len(rows), dtype=np.int64)
+        key_values = []
+        for key in group_by:
+            if key not in GROUP_KEYS:
+                raise ValueError(f"Invalid group key: {key}")
+            uniques, inverse = np.unique(self.columns[key][rows], return_inverse=True)
+            codes = codes * len(uniques) + inverse.reshape(-1)
+            key_values.append(uniques)
+        return codes, key_values
+
+    def decode_group(self, code, key_values):
+        key = []
+        for uniques in reversed(key_values):
+            code, index = divmod(int(code), len(uniques))
+            key.append(str(uniques[index]))
+        return tuple(reversed(key))
+
+    def summarize(self, values, mask, group_by=GROUP_KEYS, rows=None, extra_keys=None,
+                  percentiles=DEFAULT_PERCENTILES, scale=1.0, unit='hours'):
+        if rows is None:
+            rows = np.arange(len(values))
+        if 'week' in group_by:
+            # Rows without a creation timestamp have no week to be grouped under.
+            mask = mask & self.masks['creation_timestamp'][rows]
+        values = values[mask] / scale
+        rows = rows[mask]
+        codes, key_values = self.group_codes(group_by, rows)
+        if extra_keys is not None:
+            extra_uniques, extra_inverse = np.unique(extra_keys[mask], return_inverse=True)
+            codes = codes * len(extra_uniques) + extra_inverse.reshape(-1)
+            key_values.append(extra_uniques)
+        if len(values) == 0:
+            return []
+
+        group_codes, counts, means, result = grouped_percentiles(codes, values, percentiles)
+        summary = []
+        names = list(group_by) + (['reviewer_type'] if extra_keys is not None else [])
+        for i, code in enumerate(group_codes):
+            row = dict(zip(names, self.decode_group(code, key_values)))
+            row['count'] = int(counts[i])
+            row[f'mean_{unit}'] = float(means[i])
+            for j, q in enumerate(percentiles):
+                row[f'p{q}_{unit}'] = float(result[i, j])
+            summary.append(row)
+        return summary
+
+    def time_to_first_review_summary(self, group_by=GROUP_KEYS, percentiles=DEFAULT_PERCENTILES):
+        latency, mask = self.time_to_first_review()
+        return self.summarize(latency, mask, group_by, percentiles=percentiles, scale=3600.0)
+
+    def response_latency_summary(self, group_by=GROUP_KEYS, percentiles=DEFAULT_PERCENTILES):
+        latency, mask, reviewer_types, rows = self.response_latencies()
+        return self.summarize(latency, mask, group_by, rows=rows, extra_keys=reviewer_types,
+                              percentiles=percentiles, scale=3600.0)
+
+    def review_rounds_summary(self, group_by=GROUP_KEYS, percentiles=DEFAULT_PERCENTILES):
+        rounds, mask = self.review_rounds()
+        return self.summarize(rounds, mask, group_by, percentiles=percentiles, unit='rounds')
+
+
+def print_summary(title, summary):
+    print("=" * 50)
+    print(f"\n{title}:")
+    for row in summary:
+        print(", ".join(f"{key}: {value:.2f}" if isinstance(value, float) else f"{key}: {value}"
+                        for key, value in row.items()))
+    print("=" * 50)
+
+
+def main():
+    try:
+        file_name = input("Enter the PR analysis CSV file: ")
+        analytics = PRReviewAnalytics()
+        analytics.load_csv(file_name)
+
+        print_summary("Time to first review", analytics.time_to_first_review_summary())
+        print_summary("Response latency by reviewer type", analytics.response_latency_summary())
+        print_summary("Review rounds per PR", analytics.review_rounds_summary())
+
+    except FileNotFoundError:
+        print(f"Error: File {file_name} not found")
+    except Exception as e:
+        print(f"An error occurred: {e}")
+
+if __name__ == "__main__":
+    main()
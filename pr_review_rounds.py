@@ -0,0 +1,89 @@
+# File: pr_review_rounds.py
+
+from bisect import bisect_right
+
+class PRReviewRounds:
+    def __init__(self, creation_time, num_pr_creation_commits, incremental_commit_times):
+        # Every push opens an interval on the PR timeline: the PR creation first, then each
+        # incremental commit. Review events are bucketed into the interval they fall in,
+        # which is the same as merging them into one sorted timeline without sorting.
+        self.push_times = [creation_time] + sorted(incremental_commit_times)
+        self.push_num_commits = [num_pr_creation_commits] + [1] * len(incremental_commit_times)
+        self.intervals = [None] * len(self.push_times)
+        self.counted_review_ids = set()
+
+    def add_review_event(self, created_at, reviewer, kind='comment', review_id=None):
+        index = max(bisect_right(self.push_times, created_at) - 1, 0)
+        interval = self.intervals[index]
+        if interval is None:
+            interval = {
+                'first_review_timestamp': created_at,
+                'first_review_type': reviewer,
+                'last_review_timestamp': created_at,
+                'last_review_type': reviewer,
+                'num_comments': 0,
+                'num_reviews': 0,
+                'reviewer_types': {}
+            }
+            self.intervals[index] = interval
+        elif created_at < interval['first_review_timestamp']:
+            interval['first_review_timestamp'] = created_at
+            interval['first_review_type'] = reviewer
+        elif created_at >= interval['last_review_timestamp']:
+            interval['last_review_timestamp'] = created_at
+            interval['last_review_type'] = reviewer
+
+        if kind == 'review':
+            interval['num_reviews'] = interval['num_reviews'] + 1
+        else:
+            interval['num_comments'] = interval['num_comments'] + 1
+        # A review submission and the comments it carries are one reviewer action within a
+        # round; a pending review submitted after a later push is counted in both rounds.
+        if review_id is not None:
+            if (index, review_id) in self.counted_review_ids:
+                return
+            self.counted_review_ids.add((index, review_id))
+        interval['reviewer_types'][reviewer] = interval['reviewer_types'].get(reviewer, 0) + 1
+
+    def get_rounds(self):
+        # A round is push -> reviews -> push. Pushes with no review before the next push
+        # are folded into the following round, whose latency is measured from its last push.
+        rounds = []
+        num_commits = 0
+        for index, interval in enumerate(self.intervals):
+            num_commits = num_commits + self.push_num_commits[index]
+            is_last_push = index == len(self.intervals) - 1
+            if interval is None and not is_last_push:
+                continue
+
+            review_round = {
+                'round': len(rounds) + 1,
+                'push_timestamp': str(self.push_times[index]),
+                'num_commits': num_commits
+            }
+            if interval:
+                latency = interval['first_review_timestamp'] - self.push_times[index]
+                review_round['first_review_type'] = interval['first_review_type']
+                review_round['first_review_timestamp'] = str(interval['first_review_timestamp'])
+                review_round['last_review_type'] = interval['last_review_type']
+                review_round['last_review_timestamp'] = str(interval['last_review_timestamp'])
+                review_round['latency_seconds'] = int(latency.total_seconds())
+                review_round['num_comments'] = interval['num_comments']
+                review_round['num_reviews'] = interval['num_reviews']
+                review_round['reviewer_types'] = dict(interval['reviewer_types'])
+            else:
+                # The last push has not been reviewed yet.
+                review_round['first_review_type'] = 'N.A.'
+                review_round['first_review_timestamp'] = 'N.A.'
+                review_round['last_review_type'] = 'N.A.'
+                review_round['last_review_timestamp'] = 'N.A.'
+                review_round['latency_seconds'] = 'N.A.'
+                review_round['num_comments'] = 0
+                review_round['num_reviews'] = 0
+                review_round['reviewer_types'] = {}
+            rounds.append(review_round)
+            num_commits = 0
+        return rounds
+
+    def get_num_reviewed_rounds(self):
+        return sum(1 for interval in self.intervals if interval)
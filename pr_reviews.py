@@ -1,13 +1,15 @@
-from github import Github
+from datetime import timezone
 import re
 import requests
+from pr_client_factory import get_client_factory
 
-# Replace with your GitHub personal access token
-TOKEN = "TOKEN"
-
-def get_diff_hunk_for_comment(pr, comment):
+def get_diff_hunk_for_comment(pr, comment, patch_store=None):
     lines = []
-    for file in pr.get_files():
+    if patch_store:
+        files = patch_store.get_pr_files(pr)
+    else:
+        files = pr.get_files()
+    for file in files:
         if file.filename == comment.path:
             patch = file.patch
             if patch:
@@ -32,26 +34,22 @@ def get_diff_hunk_for_comment(pr, comment):
     
     return '\n'.join(lines)
 
-def get_review_comments_with_diff_hunks(repo_owner, repo_name, pr_number, token):
-    url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/pulls/{pr_number}/comments"
-    headers = {
-        "Authorization": f"token {token}",
-        "Accept": "application/vnd.github.v3+json"
-    }
+def get_review_comments_with_diff_hunks(repo_owner, repo_name, pr_number, client_factory=None):
+    if client_factory is None:
+        client_factory = get_client_factory()
+    url = f"{client_factory.api_url}/repos/{repo_owner}/{repo_name}/pulls/{pr_number}/comments"
+    headers = client_factory.get_api_headers()
     response = requests.get(url, headers=headers)
     print('GitHub API response: ', response)
     print('GitHub API response JSON: ', response.json())
     return response.json()
 
-def parse_pr_url(url):
-    pattern = r"https://github.com/([^/]+)/([^/]+)/pull/(\d+)"
-    match = re.match(pattern, url)
-    if match:
-        return match.groups()
-    else:
-        raise ValueError("Invalid PR URL format")
+def parse_pr_url(url, client_factory=None):
+    if client_factory is None:
+        client_factory = get_client_factory()
+    return client_factory.parse_pr_url(url)
 
-def get_review_comments(pr):
+def get_review_comments(pr, patch_store=None):
     review_comments = pr.get_review_comments()
     #review_comments = pr.get_comments()
     comments_data = []
@@ -72,7 +70,7 @@ def get_review_comments(pr):
 #            "reactions": comment.reactions.total_count
         }
 
-        diff_hunk = get_diff_hunk_for_comment(pr, comment)
+        diff_hunk = get_diff_hunk_for_comment(pr, comment, patch_store)
         comment_data['diff_hunk'] = diff_hunk
         #if diff_hunk:
         #    print(f"Comment ID: {comment.id}")
@@ -87,10 +85,15 @@ def get_review_comments(pr):
 
 def main():
     try:
+        client_factory = get_client_factory()
+        if not client_factory.is_valid_config:
+            print("PR reviews cannot be retrieved because of invalid configuration.")
+            return
+
         pr_url = input("Enter the GitHub PR URL: ")
-        repo_owner, repo_name, pr_number = parse_pr_url(pr_url)
+        repo_owner, repo_name, pr_number = parse_pr_url(pr_url, client_factory)
 
-        g = Github(TOKEN)
+        g = client_factory.get_github()
         repo = g.get_repo(f"{repo_owner}/{repo_name}")
         pr = repo.get_pull(int(pr_number))
 
@@ -122,7 +125,7 @@ def main():
         print("Merge Timestamp: ", merge_time)
         print("Close Timestamp: ", close_time)
 
-        review_comments = get_review_comments(pr)
+        review_comments = get_review_comments(pr, client_factory.get_patch_store())
 
         print(f"Total review comments: {len(review_comments)}")
         for comment in review_comments:
@@ -144,7 +147,7 @@ def main():
             #print(f"Reactions count: {comment['reactions']}")
             print("-" * 50)
 
-        #comments = get_review_comments_with_diff_hunks(repo_owner, repo_name, pr_number, TOKEN)
+        #comments = get_review_comments_with_diff_hunks(repo_owner, repo_name, pr_number, client_factory)
         #for comment in comments:
         #    print(comment['diff_hunk'])
 
@@ -0,0 +1,325 @@
+# File: pr_webhook_service.py
+
+import hashlib
+import hmac
+import json
+import os
+import re
+import tempfile
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pr_analysis import PRAnalysis, parse_timestamp
+
+SUPPORTED_EVENTS = ('pull_request', 'pull_request_review', 'pull_request_review_comment', 'push')
+
+# owner/repo/number, stored as <store_dir>/<owner>/<repo>/<number>.json. Owner and repo names
+# may contain '-', so they are kept as separate path parts, each checked so a key never leaves
+# the store directory.
+PR_KEY_PATTERN = re.compile(r'([A-Za-z0-9_.-]+)/([A-Za-z0-9_.-]+)/(\d+)')
+
+def is_valid_pr_key(pr_key):
+    match = PR_KEY_PATTERN.fullmatch(pr_key)
+    return bool(match) and match.group(1) not in ('.', '..') and match.group(2) not in ('.', '..')
+
+class PRWebhookService:
+    def __init__(self, pr_analysis, store_dir=None):
+        self.pr_analysis = pr_analysis
+        properties = pr_analysis.properties
+        self.host = properties.get('webhook.host', '127.0.0.1')
+        self.port = int(properties.get('webhook.port', '8000'))
+        self.secret = properties.get('webhook.secret', '')
+        self.store_dir = store_dir or properties.get('webhook.store_dir', 'pr_analysis_store')
+        self.fetch_missing = properties.get('webhook.fetch_missing', 'false').lower() == 'true'
+        os.makedirs(self.store_dir, exist_ok=True)
+
+        # (owner, repo, source branch) -> PR keys, so a push only touches the PRs of that branch.
+        self.branch_index = {}
+        for repo_owner in sorted(os.listdir(self.store_dir)):
+            owner_dir = os.path.join(self.store_dir, repo_owner)
+            if not os.path.isdir(owner_dir):
+                continue
+            for repo_name in sorted(os.listdir(owner_dir)):
+                repo_dir = os.path.join(owner_dir, repo_name)
+                if not os.path.isdir(repo_dir):
+                    continue
+                for file_name in sorted(os.listdir(repo_dir)):
+                    if file_name.endswith('.json'):
+                        pr_state = self.load_pr_state(self.get_pr_key(repo_owner, repo_name, file_name[:-len('.json')]))
+                        if pr_state:
+                            self.index_pr_state(pr_state)
+
+    def get_pr_key(self, repo_owner, repo_name, pr_number):
+        return f"{repo_owner}/{repo_name}/{pr_number}"
+
+    def get_pr_state_file(self, pr_key):
+        repo_owner, repo_name, pr_number = pr_key.split('/')
+        return os.path.join(self.store_dir, repo_owner, repo_name, pr_number + '.json')
+
+    def index_pr_state(self, pr_state):
+        branch_key = (pr_state['repo_owner'], pr_state['repo_name'], pr_state['source_branch'])
+        self.branch_index.setdefault(branch_key, set()).add(pr_state['key'])
+
+    def load_pr_state(self, pr_key):
+        if not is_valid_pr_key(pr_key):
+            return None
+        try:
+            with open(self.get_pr_state_file(pr_key), 'r', encoding='utf-8') as json_file:
+                return json.load(json_file)
+        except FileNotFoundError:
+            return None
+
+    def save_pr_state(self, pr_state):
+        # Write to a temporary file first so a crash never leaves a truncated PR state behind.
+        if not is_valid_pr_key(pr_state['key']):
+            raise ValueError(f"Invalid PR key: {pr_state['key']}")
+        file_name = self.get_pr_state_file(pr_state['key'])
+        os.makedirs(os.path.dirname(file_name), exist_ok=True)
+        with open(file_name + '.tmp', 'w', encoding='utf-8') as json_file:
+            json.dump(pr_state, json_file, indent=4)
+        os.replace(file_name + '.tmp', file_name)
+        self.index_pr_state(pr_state)
+
+    def update_pr_metadata(self, pr_state, pull_request):
+        pr_state['source_branch'] = pull_request['head']['ref']
+        pr_state['target_branch'] = pull_request['base']['ref']
+        self.pr_analysis.html_description = pull_request.get('body')
+        if self.pr_analysis.html_description:
+            pr_state['description'] = self.pr_analysis.convert_html_to_plaintext()
+        else:
+            pr_state['description'] = ''
+        pr_state['merge_time'] = str(parse_timestamp(pull_request.get('merged_at')))
+        pr_state['close_time'] = str(parse_timestamp(pull_request.get('closed_at')))
+
+    def create_pr_state(self, pull_request, action):
+        repo = pull_request['base']['repo']
+        pr_key = self.get_pr_key(repo['owner']['login'], repo['name'], pull_request['number'])
+
+        if self.fetch_missing:
+            # One full fetch to seed the PR; every later event is applied incrementally.
+            # The stored state needs every comment, so the streaming mode is bypassed here.
+            stream_review_comments = self.pr_analysis.stream_review_comments
+            self.pr_analysis.stream_review_comments = False
+            try:
+                pr_analysis_dict = self.pr_analysis.build_pr_analysis_data(pull_request['html_url'])
+            finally:
+                self.pr_analysis.stream_review_comments = stream_review_comments
+            if pr_analysis_dict:
+                pr_state = self.pr_analysis.export_pr_state()
+                pr_state['key'] = pr_key
+                return pr_state
+
+        creation_time = str(parse_timestamp(pull_request['created_at']))
+        # Only an 'opened' payload tells how many commits the PR was created with: its
+        # 'commits' field is the current total. Those commits precede the creation time,
+        # which is all the full review window needs. A PR first seen later has unknown
+        # commit counts until it is seeded with webhook.fetch_missing=true.
+        commit_counts_known = action == 'opened'
+        if commit_counts_known:
+            pr_creation_commit_times = [creation_time] * int(pull_request.get('commits', 1) or 1)
+        else:
+            pr_creation_commit_times = []
+        pr_state = {
+            'key': pr_key,
+            'url': pull_request['html_url'],
+            'repo_owner': repo['owner']['login'],
+            'repo_name': repo['name'],
+            'pr_number': str(pull_request['number']),
+            'creation_time': creation_time,
+            'commit_shas': [],
+            'commit_counts_known': commit_counts_known,
+            'pr_creation_commit_times': pr_creation_commit_times,
+            'incremental_commit_times': [],
+            'review_submissions': [],
+            'comments': []
+        }
+        self.update_pr_metadata(pr_state, pull_request)
+        return pr_state
+
+    def get_or_create_pr_state(self, pull_request, action=''):
+        repo = pull_request['base']['repo']
+        pr_key = self.get_pr_key(repo['owner']['login'], repo['name'], pull_request['number'])
+        pr_state = self.load_pr_state(pr_key)
+        if not pr_state:
+            pr_state = self.create_pr_state(pull_request, action)
+        return pr_state
+
+    def recompute_pr_analysis(self, pr_state):
+        self.pr_analysis.import_pr_state(pr_state)
+        pr_state['analysis'] = self.pr_analysis.build_pr_analysis_dict()
+        if not pr_state.get('commit_counts_known', True):
+            pr_state['analysis']['num_commits_before_pr_creation'] = 'N.A.'
+            pr_state['analysis']['num_commits_incremental'] = 'N.A.'
+        self.save_pr_state(pr_state)
+        return pr_state['analysis']
+
+    def handle_pull_request(self, payload):
+        pull_request = payload['pull_request']
+        pr_state = self.get_or_create_pr_state(pull_request, payload.get('action', ''))
+        self.update_pr_metadata(pr_state, pull_request)
+        return [self.recompute_pr_analysis(pr_state)]
+
+    def handle_review_comment(self, payload):
+        pr_state = self.get_or_create_pr_state(payload['pull_request'])
+        comment = payload['comment']
+        action = payload.get('action', 'created')
+        comments = [stored for stored in pr_state['comments'] if stored['id'] != comment['id']]
+
+        if action != 'deleted':
+            comment_data = {
+                'id': comment['id'],
+                'user': comment['user']['login'],
+                'created_at': str(parse_timestamp(comment['created_at'])),
+                'updated_at': str(parse_timestamp(comment['updated_at'])),
+                'path': comment.get('path'),
+                'commit_id': comment.get('commit_id'),
+                'review_id': comment.get('pull_request_review_id'),
+                'reviewer': self.pr_analysis.classify_comment(comment.get('body'))
+            }
+            # Comments almost always arrive in order, so walk back from the end to find the slot.
+            created_at = parse_timestamp(comment_data['created_at'])
+            position = len(comments)
+            while position > 0 and parse_timestamp(comments[position - 1]['created_at']) > created_at:
+                position = position - 1
+            comments.insert(position, comment_data)
+
+        pr_state['comments'] = comments
+        return [self.recompute_pr_analysis(pr_state)]
+
+    def handle_review(self, payload):
+        pr_state = self.get_or_create_pr_state(payload['pull_request'])
+        review = payload['review']
+        review_submissions = [stored for stored in pr_state.get('review_submissions', []) if stored['id'] != review['id']]
+
+        if payload.get('action', 'submitted') != 'dismissed' and review.get('submitted_at'):
+            review_submissions.append({
+                'id': review['id'],
+                'user': review['user']['login'] if review.get('user') else '',
+                'state': review.get('state'),
+                'submitted_at': str(parse_timestamp(review['submitted_at'])),
+                'reviewer': self.pr_analysis.classify_comment(review.get('body'))
+            })
+
+        pr_state['review_submissions'] = review_submissions
+        return [self.recompute_pr_analysis(pr_state)]
+
+    def handle_push(self, payload):
+        ref = payload.get('ref', '')
+        if not ref.startswith('refs/heads/'):
+            return []
+        repo = payload['repository']
+        repo_owner = repo['owner'].get('login') or repo['owner'].get('name')
+        branch_key = (repo_owner, repo['name'], ref[len('refs/heads/'):])
+
+        pr_analysis_dict_list = []
+        for pr_key in sorted(self.branch_index.get(branch_key, [])):
+            pr_state = self.load_pr_state(pr_key)
+            if not pr_state:
+                continue
+            creation_time = parse_timestamp(pr_state['creation_time'])
+            for commit in payload.get('commits', []):
+                if commit['id'] in pr_state['commit_shas']:
+                    continue
+                pr_state['commit_shas'].append(commit['id'])
+                commit_time = parse_timestamp(commit['timestamp'])
+                if commit_time > creation_time:
+                    pr_state['incremental_commit_times'].append(str(commit_time))
+                else:
+                    pr_state['pr_creation_commit_times'].append(str(commit_time))
+            pr_analysis_dict_list.append(self.recompute_pr_analysis(pr_state))
+        return pr_analysis_dict_list
+
+    def handle_event(self, event_type, payload):
+        if event_type == 'pull_request':
+            return self.handle_pull_request(payload)
+        elif event_type == 'pull_request_review':
+            return self.handle_review(payload)
+        elif event_type == 'pull_request_review_comment':
+            return self.handle_review_comment(payload)
+        elif event_type == 'push':
+            return self.handle_push(payload)
+        return []
+
+    def is_valid_signature(self, body, signature):
+        if not self.secret:
+            return True
+        expected = 'sha256=' + hmac.new(self.secret.encode('utf-8'), body, hashlib.sha256).hexdigest()
+        return hmac.compare_digest(expected, signature or '')
+
+    def replay_payloads(self, file_name):
+        # Each line of the file is a recorded delivery: {"event": "<X-GitHub-Event>", "payload": {...}}
+        pr_analysis_dict_list = []
+        with open(file_name, 'r', encoding='utf-8') as replay_file:
+            for line in replay_file:
+                line = line.strip()
+                if line:
+                    delivery = json.loads(line)
+                    pr_analysis_dict_list.extend(self.handle_event(delivery['event'], delivery['payload']))
+        return pr_analysis_dict_list
+
+    def serve(self):
+        service = self
+
+        class PRWebhookRequestHandler(BaseHTTPRequestHandler):
+            def send_json(self, status, data):
+                response = json.dumps(data, indent=2).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(response)))
+                self.end_headers()
+                self.wfile.write(response)
+
+            def do_GET(self):
+                pr_key = self.path.strip('/')
+                if not is_valid_pr_key(pr_key):
+                    self.send_json(400, {'error': 'Invalid PR key'})
+                    return
+                pr_state = service.load_pr_state(pr_key)
+                if pr_state:
+                    self.send_json(200, pr_state.get('analysis', {}))
+                else:
+                    self.send_json(404, {'error': 'Unknown PR'})
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if not service.is_valid_signature(body, self.headers.get('X-Hub-Signature-256')):
+                    self.send_json(401, {'error': 'Invalid signature'})
+                    return
+                event_type = self.headers.get('X-GitHub-Event', '')
+                if event_type not in SUPPORTED_EVENTS:
+                    self.send_json(202, {'ignored': event_type})
+                    return
+                try:
+                    self.send_json(200, service.handle_event(event_type, json.loads(body)))
+                except Exception as e:
+                    print(f"An error occurred: {e}")
+                    self.send_json(400, {'error': str(e)})
+
+        server = HTTPServer((self.host, self.port), PRWebhookRequestHandler)
+        print(f"Listening for GitHub webhooks on {self.host}:{self.port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("Stopped the webhook service.")
+        finally:
+            server.server_close()
+
+def main():
+    pr_analysis = PRAnalysis()
+    if pr_analysis.is_valid_config:
+        try:
+            replay_file = input("Enter recorded webhook payloads file (leave empty to start the service): ")
+            if replay_file:
+                # Replays run against a scratch store so they never touch the live PR states.
+                with tempfile.TemporaryDirectory() as store_dir:
+                    service = PRWebhookService(pr_analysis, store_dir)
+                    for pr_analysis_dict in service.replay_payloads(replay_file):
+                        print(json.dumps(pr_analysis_dict, indent=2))
+            else:
+                PRWebhookService(pr_analysis).serve()
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            print('Failed to run the PR webhook service.')
+    else:
+        print("PR Webhook service cannot be started because it has received invalid configuration.")
+
+if __name__ == "__main__":
+    main()
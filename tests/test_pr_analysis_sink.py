@@ -0,0 +1,86 @@
+import csv
+import glob
+import json
+import os
+import pytest
+import pr_analysis_sink
+from pr_analysis_sink import get_sink
+
+FORMATS = [
+    'csv',
+    'jsonl',
+    pytest.param('parquet', marks=pytest.mark.skipif(pr_analysis_sink.pa is None, reason='pyarrow is not installed')),
+]
+
+
+def make_row(number, month, merged='N.A.', num_review_rounds=1):
+    return {
+        'url': f'https://github.com/acme/demo/pull/{number}',
+        'repo_name': 'demo',
+        'repo_owner': 'acme',
+        'creation_timestamp': f'2024-{month:02d}-01 12:00:00+00:00',
+        'merge_timestamp': merged,
+        'num_review_rounds': num_review_rounds,
+    }
+
+
+def write_run(output_format, output_dir, rows, append, batch_size=2):
+    with get_sink(output_format, str(output_dir), batch_size, append) as sink:
+        sink.write_all(rows)
+    return sink.num_rows
+
+
+def read_output(output_format, output_dir):
+    rows = {}
+    if output_format == 'csv':
+        for file_name in glob.glob(os.path.join(output_dir, '*.csv')):
+            with open(file_name, 'r', newline='', encoding='utf-8') as csvfile:
+                for row in csv.DictReader(csvfile):
+                    rows.setdefault(row['url'], []).append(int(row['num_review_rounds']))
+    elif output_format == 'jsonl':
+        for file_name in glob.glob(os.path.join(output_dir, '*.jsonl')):
+            with open(file_name, 'r', encoding='utf-8') as jsonl_file:
+                for line in jsonl_file:
+                    row = json.loads(line)
+                    rows.setdefault(row['url'], []).append(row['num_review_rounds'])
+    else:
+        for file_name in glob.glob(os.path.join(output_dir, 'repo=*', 'month=*', '*.parquet')):
+            for row in pr_analysis_sink.pq.ParquetFile(file_name).read().to_pylist():
+                rows.setdefault(row['url'], []).append(row['num_review_rounds'])
+    return {url.rsplit('/', 1)[1]: values for url, values in rows.items()}
+
+
+@pytest.mark.parametrize('output_format', FORMATS)
+def test_append_refreshes_stored_prs_and_adds_new_ones(output_format, tmp_path):
+    write_run(output_format, tmp_path, [make_row(1, 10), make_row(2, 10), make_row(3, 11)], append=True)
+    num_rows = write_run(output_format, tmp_path, [make_row(2, 10, num_review_rounds=4), make_row(4, 11)], append=True)
+
+    assert num_rows == 2
+    assert read_output(output_format, tmp_path) == {'1': [1], '2': [4], '3': [1], '4': [1]}
+
+
+@pytest.mark.parametrize('output_format', FORMATS)
+def test_rows_repeated_within_a_run_keep_the_latest(output_format, tmp_path):
+    rows = [make_row(1, 10), make_row(2, 10), make_row(1, 10, num_review_rounds=2), make_row(1, 10, num_review_rounds=3)]
+    num_rows = write_run(output_format, tmp_path, rows, append=False, batch_size=1)
+
+    assert num_rows == 2
+    assert read_output(output_format, tmp_path) == {'1': [3], '2': [1]}
+
+
+@pytest.mark.parametrize('output_format', FORMATS)
+def test_replace_rewrites_only_the_partitions_written(output_format, tmp_path):
+    write_run(output_format, tmp_path, [make_row(1, 10), make_row(2, 11)], append=False)
+    write_run(output_format, tmp_path, [make_row(2, 11, num_review_rounds=5), make_row(3, 11)], append=False)
+
+    if output_format == 'parquet':
+        # The October partition was not part of the second run, so it is kept.
+        assert read_output(output_format, tmp_path) == {'1': [1], '2': [5], '3': [1]}
+    else:
+        # CSV and JSONL partition by repo only, so the repo file is replaced as a whole.
+        assert read_output(output_format, tmp_path) == {'2': [5], '3': [1]}
+
+
+def test_base_sink_requires_the_partition_hooks():
+    with pytest.raises(TypeError):
+        pr_analysis_sink.PRAnalysisSink()
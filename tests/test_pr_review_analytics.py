@@ -0,0 +1,42 @@
+import csv
+import numpy as np
+import pr_review_analytics
+from pr_review_analytics import PRReviewAnalytics, parse_timestamp_column
+
+COLUMNS = ['url', 'repo_owner', 'repo_name', 'target_branch', 'creation_timestamp', 'first_suggestion_review_timestamp']
+ROWS = [
+    ['https://github.com/o/r/pull/1', 'o', 'r', 'main', '2024-10-02 12:00:00', '2024-10-02 13:00:00'],
+    ['https://github.com/o/r/pull/2', 'o', 'r', 'main', '2024-10-02 12:00:00-04:00', '2024-10-02 17:00:00+00:00'],
+    ['https://github.com/o/r/pull/3', 'o', 'r', 'main', '2024-10-02 12:00:00.5+00:00', 'N.A.'],
+]
+
+
+def write_csv(path):
+    with open(path, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(COLUMNS)
+        writer.writerows(ROWS)
+    return str(path)
+
+
+def test_parse_timestamp_column_applies_offsets_and_assumes_utc():
+    parsed, mask = parse_timestamp_column(['2024-10-02 12:00:00-04:00', '2024-10-02 12:00:00', 'N.A.', '2024-10-02 12:00:00+05:30'])
+    expected = np.array(['2024-10-02T16:00:00', '2024-10-02T12:00:00', 'NaT', '2024-10-02T06:30:00'], dtype='datetime64[s]')
+    assert mask.tolist() == [True, True, False, True]
+    assert (parsed[mask] == expected[mask]).all()
+
+
+def test_naive_and_offset_timestamps_load_the_same_with_and_without_arrow(tmp_path, monkeypatch):
+    file_name = write_csv(tmp_path / 'analysis.csv')
+    loaded = []
+    for arrow_csv in (pr_review_analytics.pa_csv, None):
+        monkeypatch.setattr(pr_review_analytics, 'pa_csv', arrow_csv)
+        analytics = PRReviewAnalytics()
+        analytics.load_csv(file_name)
+        loaded.append(analytics)
+
+    for analytics in loaded:
+        assert analytics.columns['creation_timestamp'].tolist() == np.array(
+            ['2024-10-02T12:00:00', '2024-10-02T16:00:00', '2024-10-02T12:00:00'], dtype='datetime64[s]').tolist()
+        assert analytics.masks['first_suggestion_review_timestamp'].tolist() == [True, True, False]
+        assert analytics.time_to_first_review()[0][:2].tolist() == [3600, 3600]
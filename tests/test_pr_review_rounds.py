@@ -0,0 +1,32 @@
+from datetime import datetime, timezone
+from pr_review_rounds import PRReviewRounds
+
+
+def at(hour):
+    return datetime(2024, 10, 1, hour, tzinfo=timezone.utc)
+
+
+def test_review_and_its_comments_count_once_per_round():
+    review_rounds = PRReviewRounds(at(0), 2, [at(5)])
+    review_rounds.add_review_event(at(1), 'Bito', 'comment', 300)
+    review_rounds.add_review_event(at(1), 'Bito', 'comment', 300)
+    review_rounds.add_review_event(at(1), 'Bito', 'review', 300)
+    review_rounds.add_review_event(at(2), 'Human')
+
+    first_round = review_rounds.get_rounds()[0]
+    assert first_round['num_comments'] == 3
+    assert first_round['num_reviews'] == 1
+    assert first_round['reviewer_types'] == {'Bito': 1, 'Human': 1}
+
+
+def test_review_submitted_after_a_push_is_typed_in_its_round():
+    # The review's comments were written before the push, the submission came after it.
+    review_rounds = PRReviewRounds(at(0), 1, [at(5)])
+    review_rounds.add_review_event(at(1), 'Human', 'comment', 400)
+    review_rounds.add_review_event(at(6), 'Human', 'review', 400)
+
+    first_round, second_round = review_rounds.get_rounds()
+    assert first_round['reviewer_types'] == {'Human': 1}
+    assert second_round['num_reviews'] == 1
+    assert second_round['reviewer_types'] == {'Human': 1}
+    assert second_round['latency_seconds'] == 3600
@@ -0,0 +1,92 @@
+import json
+import os
+from pr_analysis import PRAnalysis
+from pr_webhook_service import PRWebhookService
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+AI_REVIEWER_REGEX = r'<div id="issue"><b>(.*?)</b></div>.*?<div id="fix">\s*(.*?)\s*</div>.*?<div id="code">(.*?)</div>.*?<a href=(.*?)>#(\w+)</a>'
+
+
+def make_service(tmp_path):
+    properties_file = tmp_path / 'pr_analysis.properties'
+    properties_file.write_text('\n'.join([
+        'git.provider=GITHUB',
+        'git.access_token=dummy',
+        'git.domain=https://github.com',
+        'default.reviewer=Human',
+        'ai.reviewer=Bito',
+        f'ai.reviewer.regex={AI_REVIEWER_REGEX}',
+        f'webhook.store_dir={tmp_path / "store"}',
+    ]) + '\n')
+    pr_analysis = PRAnalysis(str(properties_file))
+    assert pr_analysis.is_valid_config
+    return PRWebhookService(pr_analysis)
+
+
+def test_replay_builds_incremental_analysis(tmp_path):
+    service = make_service(tmp_path)
+    results = service.replay_payloads(os.path.join(FIXTURES_DIR, 'webhook_replay.jsonl'))
+    assert len(results) == 7
+
+    pr_state = service.load_pr_state('acme/demo/7')
+    analysis = pr_state['analysis']
+    assert analysis['url'] == 'https://github.com/acme/demo/pull/7'
+    assert analysis['description'] == 'Adds thewidget'
+    assert analysis['num_commits_before_pr_creation'] == 2
+    assert analysis['num_commits_incremental'] == 1
+    assert analysis['num_comments_made_by_ai'] == 1
+    assert analysis['num_comments_made_by_human'] == 1
+    assert analysis['first_full_review_type'] == 'Bito'
+    assert analysis['first_full_review_timestamp'] == '2024-10-01 12:05:00+00:00'
+    # The push timestamp is recorded in the committer's -04:00 offset and stored in UTC.
+    assert analysis['first_incremental_commit_timestamp'] == '2024-10-01 14:00:00+00:00'
+    assert analysis['first_incremental_review_type'] == 'Human'
+    assert analysis['first_incremental_review_timestamp'] == '2024-10-01 15:00:00+00:00'
+    assert analysis['num_review_rounds'] == 2
+    assert json.loads(analysis['num_comments_by_reviewer']) == {'Bito': 1, 'Human': 1}
+
+    review_rounds = json.loads(analysis['review_rounds'])
+    assert [review_round['latency_seconds'] for review_round in review_rounds] == [300, 3600]
+    # Each submission is counted once together with its comments, and takes their type.
+    assert review_rounds[0]['first_review_type'] == 'Bito'
+    assert review_rounds[0]['reviewer_types'] == {'Bito': 1}
+    assert review_rounds[0]['num_reviews'] == 1
+    assert review_rounds[1]['reviewer_types'] == {'Human': 1}
+
+
+def test_pr_first_seen_late_has_unknown_commit_counts(tmp_path):
+    service = make_service(tmp_path)
+    service.replay_payloads(os.path.join(FIXTURES_DIR, 'webhook_replay.jsonl'))
+
+    analysis = service.load_pr_state('acme/demo/8')['analysis']
+    assert analysis['num_commits_before_pr_creation'] == 'N.A.'
+    assert analysis['num_commits_incremental'] == 'N.A.'
+    assert analysis['num_comments_made_by_human'] == 1
+
+
+def test_invalid_pr_key_is_rejected(tmp_path):
+    service = make_service(tmp_path)
+    (tmp_path / 'secret.json').write_text('{"analysis": {}}')
+    assert service.load_pr_state('../secret') is None
+    assert service.load_pr_state('../../secret') is None
+    assert service.load_pr_state('acme/../1') is None
+    assert service.load_pr_state('acme/demo/404') is None
+
+
+def test_owner_and_repo_names_with_dashes_do_not_collide(tmp_path):
+    service = make_service(tmp_path)
+    service.replay_payloads(os.path.join(FIXTURES_DIR, 'webhook_replay_dashed_repos.jsonl'))
+
+    first = service.load_pr_state('foo-bar/baz/1')
+    second = service.load_pr_state('foo/bar-baz/1')
+    assert first['url'] == 'https://github.com/foo-bar/baz/pull/1'
+    assert second['url'] == 'https://github.com/foo/bar-baz/pull/1'
+    # Each push only reaches the PR of its own repo.
+    assert first['analysis']['num_commits_incremental'] == 1
+    assert second['analysis']['num_commits_incremental'] == 0
+    assert first['analysis']['first_incremental_commit_timestamp'] == '2024-10-01 13:00:00+00:00'
+
+    # States are found again from the store when the service restarts.
+    restarted = PRWebhookService(service.pr_analysis, service.store_dir)
+    assert restarted.branch_index[('foo-bar', 'baz', 'feature')] == {'foo-bar/baz/1'}
+    assert restarted.branch_index[('foo', 'bar-baz', 'feature')] == {'foo/bar-baz/1'}